@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from src.loader import load_edge_list
+
+
+def write_edge_list(path: str, n: int, m: int, weighted: bool = True):
+    rng = random.Random(0)
+    with open(path, 'w') as file:
+        file.write(f"{n} {m}\n")
+        for _ in range(m):
+            a, b = rng.randint(1, n), rng.randint(1, n)
+            if weighted:
+                file.write(f"{a} {b} {rng.randint(1, 100)}\n")
+            else:
+                file.write(f"{a} {b}\n")
+
+
+def legacy_parse(file_path: str):
+    """
+    parsing part of the old Graph.load_graph_from_file, without drawing objects
+    """
+    adj_list_undirected = defaultdict(list)
+    adj_list_directed = defaultdict(list)
+    weights = defaultdict()
+    with open(file_path, 'r') as file:
+        n, m = file.readline().split()
+        for i in range(int(n)):
+            adj_list_undirected[i+1] = []
+            adj_list_directed[i+1] = []
+        for i in range(int(m)):
+            values = file.readline().split()
+            if len(values) == 3:
+                a, b, c = values
+                weights[f'{a}-{b}'] = c
+            else:
+                a, b = values
+                weights[f'{a}-{b}'] = 1
+            a, b = int(a), int(b)
+            adj_list_undirected[a].append(b)
+            adj_list_undirected[b].append(a)
+            adj_list_directed[a].append(b)
+    edges = []
+    for v1, v_list in adj_list_directed.items():
+        for v2 in v_list:
+            edges.append((v1, v2, weights[f'{v1}-{v2}']))
+    return edges
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    print(f"{'edges':>10} {'legacy s':>10} {'bulk s':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for m in sizes:
+            path = os.path.join(tmp, f"graph_{m}.txt")
+            write_edge_list(path, max(m // 10, 1), m)
+            legacy = timed(legacy_parse, path)
+            bulk = timed(load_edge_list, path)
+            print(f"{m:>10} {legacy:>10.3f} {bulk:>10.3f} {legacy / bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,55 @@
+import random
+import sys
+import time
+
+from src.mst import MSTMethod, minimum_spanning_forest
+
+EDGES = 300_000
+DEGREES = (1, 3, 10, 30, 100, 300)  # edges per vertex
+
+
+def random_graph(n: int, m: int, seed: int = 0):
+    rng = random.Random(seed)
+    src = [rng.randrange(n) for _ in range(m)]
+    dst = [rng.randrange(n) for _ in range(m)]
+    weights = [rng.randint(1, 100) for _ in range(m)]
+    return src, dst, weights
+
+
+def forest_size(n: int, src, dst) -> int:
+    """
+    n minus number of components, the target every method can stop at
+    """
+    rep = list(range(n))
+    size = 0
+    for a, b in zip(src, dst):
+        while rep[a] != a:
+            rep[a] = a = rep[rep[a]]
+        while rep[b] != b:
+            rep[b] = b = rep[rep[b]]
+        if a != b:
+            rep[a] = b
+            size += 1
+    return size
+
+
+def main(m: int = EDGES, degrees=DEGREES):
+    print(f"{'vertices':>10} {'edges':>10} {'m/n':>6}" + "".join(f" {method + ' s':>10}" for method in MSTMethod.ALL))
+    for degree in degrees:
+        n = max(m // degree, 2)
+        src, dst, weights = random_graph(n, m)
+        target = forest_size(n, src, dst)
+        row = f"{n:>10} {m:>10} {degree:>6}"
+        forests = set()
+        for method in MSTMethod.ALL:
+            start = time.perf_counter()
+            forest = minimum_spanning_forest(n, src, dst, weights, target, method)
+            row += f" {time.perf_counter() - start:>10.3f}"
+            forests.add(frozenset(forest))
+        if len(forests) != 1:
+            raise AssertionError(f"methods disagree for n={n}, m={m}")
+        print(row)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else EDGES)
@@ -0,0 +1,185 @@
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# parsed graphs are cached as snapshots, keep them out of the user cache and away from the next run
+if "GRAPH_VISUALIZER_CACHE" not in os.environ:
+    os.environ["GRAPH_VISUALIZER_CACHE"] = tempfile.mkdtemp(prefix="graph-visualizer-bench-")
+    atexit.register(shutil.rmtree, os.environ["GRAPH_VISUALIZER_CACHE"], True)
+
+import pygame
+
+from benchmarks.bench_loader import write_edge_list
+from src.algo import (AlgoController, DfsVis, BfsVis, SCCvis, MSTvis, DijkstraVis, BridesAndArticPointsVis,
+                      DistanceVis, BidirectionalVis)
+from src.constants import PathMode, WIDTH, HEIGHT
+from src.forest import SpanningForest
+from src.graph import Graph
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+THRESHOLD = 0.25  # relative slowdown reported as regression
+MIN_DELTA = 0.005  # seconds, smaller differences are noise
+
+
+def measure(func: Callable, setup: Callable = None, repeat: int = 3) -> float:
+    """
+    :return: median time of func in seconds, setup runs untimed before every call
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def reset_results(graph: Graph):
+    """
+    drops colors, cached algorithm results and the maintained spanning forest, so algorithms run from scratch
+    """
+    AlgoController(graph).clear_after_vis()
+    graph.results.clear()
+    graph.forest = SpanningForest()
+    for v in graph.vertex_dict:
+        graph.forest.add_vertex(v)
+    for e in graph.edge_arr:
+        graph.forest.add_edge(e.edge_id, e.start.number, e.end.number, int(e.weight))
+
+
+def algorithm_frames(graph: Graph) -> Dict[str, Callable]:
+    """
+    compute phase of every AlgoController, frames are run to the end without waiting between them
+    """
+    first, last = min(graph.vertex_dict), max(graph.vertex_dict)
+    return {
+        "dfs": lambda: DfsVis(graph).dfs_frames(first),
+        "bfs": lambda: BfsVis(graph).bfs_frames(first),
+        "scc": lambda: SCCvis(graph).scc_frames(),
+        "mst": lambda: MSTvis(graph).mst_frames(),
+        "dijkstra": lambda: DijkstraVis(graph).dijkstra_frames(first, last),
+        "astar": lambda: DijkstraVis(graph).dijkstra_frames(first, last, PathMode.A_STAR),
+        "bidirectional_dijkstra": lambda: BidirectionalVis(graph).path_frames(first, last, True),
+        "bidirectional_bfs": lambda: BidirectionalVis(graph).path_frames(first, last, False),
+        "distances": lambda: DistanceVis(graph).distance_frames(first),
+        "bridges": lambda: BridesAndArticPointsVis(graph).bridges_frames(),
+        "artic_points": lambda: BridesAndArticPointsVis(graph).artic_points_frames(),
+    }
+
+
+def bench_size(m: int, tmp: str, repeat: int) -> Dict[str, float]:
+    n = max(m // 10, 2)
+    path = os.path.join(tmp, f"graph_{m}.txt")
+    write_edge_list(path, n, m)
+    results = {}
+    graph = Graph()
+
+    def load():
+        # a fresh mtime makes every load miss the snapshot cache
+        os.utime(path, ns=(time.time_ns(), time.time_ns()))
+        graph.load_graph_from_file(path)
+
+    results["load_graph_from_file"] = measure(load, repeat=repeat)
+    graph.layout = None
+
+    empty = Graph()
+    results["make_vertex_arr"] = measure(lambda: empty.make_vertex_arr(range(1, n + 1)), empty.__init__, repeat)
+
+    graph.get_csr()
+    for name, frames in algorithm_frames(graph).items():
+        results[f"algo.{name}"] = measure(lambda: deque(frames(), maxlen=0), lambda: reset_results(graph), repeat)
+
+    win = pygame.Surface((WIDTH, HEIGHT))
+    graph.fit_view()
+
+    def frame():
+        graph.update()
+        graph.draw(win)
+
+    def invalidate():
+        # as after loading or a layout step: geometry, edge grid and heatmap are rebuilt in the frame
+        graph.edge_grid_valid = False
+        graph.geometry_valid = False
+        graph.heatmap_valid = False
+
+    results["draw.cold"] = measure(frame, invalidate, repeat)
+    results["draw.warm"] = measure(frame, repeat=repeat)
+    return results
+
+
+def run(sizes: List[int], repeat: int) -> Dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for m in sizes:
+            for name, seconds in bench_size(m, tmp, repeat).items():
+                key = f"{name}[{m}]"
+                results[key] = seconds
+                print(f"{key:>40} {seconds * 1000:>12.2f} ms", flush=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    :return: names of benchmarks slower than baseline by more than threshold and MIN_DELTA
+    """
+    regressions = []
+    print(f"\n{'benchmark':>40} {'baseline ms':>12} {'now ms':>12} {'change':>8}")
+    for key, seconds in results.items():
+        old = baseline.get(key)
+        if old is None:
+            print(f"{key:>40} {'-':>12} {seconds * 1000:>12.2f} {'new':>8}")
+            continue
+        change = seconds / old - 1 if old > 0 else 0.0
+        flag = ""
+        if change > threshold and seconds - old > MIN_DELTA:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:>40} {old * 1000:>12.2f} {seconds * 1000:>12.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="times algorithms, loading, layout and drawing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of edges")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, median is reported")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON written by --output to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative slowdown to flag")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+from typing import Iterator, List, Optional
+
+import pygame
+
+from src.constants import Colors, WIDTH, HEIGHT
+from src.fonts import render_text, text_cache
+from src.profiler import profiler
+from src.worker import BackgroundJob
+
+
+class AnimationScheduler:
+    """
+    advances visualizer frames from the main loop instead of blocking it,
+    every frame of a visualizer generator is one visible change,
+    a yielded BackgroundJob holds frames back until it is done, meanwhile its progress is drawn
+    """
+
+    DEFAULT_SPEED = 2.5
+    MIN_SPEED = 0.5
+    MAX_SPEED = 10_000
+    SPINNER = "|/-\\"
+
+    def __init__(self):
+        self.speed = self.DEFAULT_SPEED  # steps per second
+        self.paused = False
+        self.vis = None
+        self.frames: Optional[Iterator] = None
+        self.budget = 0.0
+        self.hold_left = 0
+        self.job: Optional[BackgroundJob] = None
+        self.skip_after_job = False
+
+    def is_running(self) -> bool:
+        return self.vis is not None
+
+    def start(self, vis, frames: Iterator):
+        """
+        :param vis: AlgoController whose frames are played, cleared after its hold_time
+        :param frames: generator applying one step per next()
+        """
+        self.cancel()
+        self.vis = vis
+        self.frames = frames
+        self.budget = 1.0  # first step is shown right away
+        self.hold_left = 0
+
+    def update(self, dt: int):
+        """
+        called once per frame with milliseconds since the previous one
+        """
+        if self.vis is None:
+            return
+        if self.job is not None:
+            if not self.job.done():
+                return
+            self.finish_job()
+        if self.frames is None:
+            if not self.paused:
+                self.hold_left -= dt
+            if self.hold_left <= 0:
+                self.finish()
+            return
+        if self.paused:
+            return
+        self.budget += dt * self.speed / 1000
+        while self.budget >= 1 and self.frames is not None:
+            self.budget -= 1
+            self.advance()
+
+    def advance(self) -> bool:
+        """
+        applies one step, switches to holding the final picture when frames run out
+        """
+        if self.job is not None:
+            return True
+        try:
+            with profiler.section(type(self.vis).__name__):
+                value = next(self.frames)
+            if isinstance(value, BackgroundJob):
+                self.job = value
+            return True
+        except StopIteration:
+            self.frames = None
+            self.hold_left = self.vis.hold_time
+            return False
+        except Exception as error:  # raised by compute of a job, the message stays for hold_time
+            self.vis.message = f"FAILED: {type(error).__name__} {error}".upper()
+            self.frames = None
+            self.hold_left = self.vis.hold_time
+            return False
+
+    def finish_job(self):
+        """
+        resumes frames of a finished job, its run time goes to the overlay and to the trace as a worker thread section
+        """
+        profiler.record_job("compute." + self.job.name, self.job.start_ns, self.job.end_ns, self.job.thread.ident)
+        self.job = None
+        self.budget = max(self.budget, 1.0)  # result is shown right away
+        if self.skip_after_job:
+            self.skip_after_job = False
+            self.skip_to_end()
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def step(self):
+        """
+        single step while paused
+        """
+        if self.vis is None:
+            return
+        self.paused = True
+        if self.frames is not None:
+            self.advance()
+        else:
+            self.finish()
+
+    def skip_to_end(self):
+        """
+        a running job is not waited for, the skip happens when it is done
+        """
+        while self.frames is not None and self.job is None:
+            self.advance()
+        if self.job is not None:
+            self.skip_after_job = True
+
+    def cancel(self):
+        if self.vis is None:
+            return
+        if self.job is not None:
+            self.job.cancel()
+        if self.frames is not None:
+            self.frames.close()
+        self.finish()
+
+    def finish(self):
+        self.vis.clear_after_vis()
+        self.vis = None
+        self.frames = None
+        self.paused = False
+        self.job = None
+        self.skip_after_job = False
+
+    def faster(self):
+        self.speed = min(self.speed * 2, self.MAX_SPEED)
+
+    def slower(self):
+        self.speed = max(self.speed / 2, self.MIN_SPEED)
+
+    def handle_key(self, key: int) -> bool:
+        """
+        :return: True if key was used by the scheduler
+        """
+        if key == pygame.K_UP:
+            self.faster()
+        elif key == pygame.K_DOWN:
+            self.slower()
+        elif self.vis is None:
+            return False
+        elif key == pygame.K_SPACE:
+            self.toggle_pause()
+        elif key == pygame.K_RIGHT:
+            self.step()
+        elif key == pygame.K_RETURN:
+            self.skip_to_end()
+        elif key == pygame.K_ESCAPE:
+            self.cancel()
+        else:
+            return False
+        return True
+
+    def draw(self, win: pygame.Surface) -> List[pygame.Rect]:
+        """
+        speed and pause state go to the bottom right corner, the bottom left one is taken by the profiler overlay
+        :return: painted area
+        """
+        if self.vis is None:
+            return []
+        rects = []
+        if self.job is not None:
+            rects.append(self.draw_progress(win))
+        elif self.vis.message:
+            text = render_text(self.vis.message, 35, Colors.BLACK)
+            rects.append(win.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 5 + 30))))
+        status = f"{self.speed:g} steps/s"
+        if self.paused:
+            status += "  PAUSED"
+        text = render_text(status, 15, Colors.BLACK)
+        rects.append(win.blit(text, text.get_rect(bottomright=(WIDTH - 10, HEIGHT - 10))))
+        return rects
+
+    def draw_progress(self, win: pygame.Surface) -> pygame.Rect:
+        """
+        spinner, run time and how far compute got, as a fraction if it reports one, otherwise as number of steps,
+        text changes every frame, so it does not go through the text cache
+        """
+        spinner = self.SPINNER[pygame.time.get_ticks() // 100 % len(self.SPINNER)]
+        progress = f"{spinner} COMPUTING {self.job.name.upper()}  {self.job.elapsed():.1f} s"
+        if self.job.progress:
+            progress += f"  {self.job.progress:.0%}"
+        elif self.job.steps:
+            progress += f"  {self.job.steps} STEPS"
+        text = text_cache.get_font(25).render(progress + "  (ESC CANCELS)", True, Colors.BLACK)
+        return win.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 5 + 30)))
@@ -16,6 +16,7 @@ class ButtonsBar:
 
     def __init__(self):
         self.color = Colors.DARK_GREY
+        self.path_mode = PathMode.DIJKSTRA
         self.rect = pygame.Rect(0, 0, WIDTH, HEIGHT // 5)
         self.buttons = [
             Button("LOAD GRAPH", 15, (10, 5, 150, 40), Colors.GREEN, Colors.DARK_GREEN),
@@ -33,7 +34,9 @@ class ButtonsBar:
             Button("BRIDGES", 15, (510, 35, 150, 40), Colors.GREEN, Colors.DARK_GREEN),
             Button("ARTIC. POINTS", 15, (510, 85, 150, 40), Colors.GREEN, Colors.DARK_GREEN),
             # WEIGHTED
-            Button("DIJKSTRA", 15, (670, 35, 150, 40), Colors.GREEN, Colors.DARK_GREEN),
+            Button("DIJKSTRA", 15, (670, 35, 110, 40), Colors.GREEN, Colors.DARK_GREEN),
+            Button(PathMode.DIJKSTRA, 20, (780, 35, 40, 40), Colors.BLUE, Colors.DARK_BLUE),
+            Button("DISTANCES", 15, (670, 85, 150, 40), Colors.GREEN, Colors.DARK_GREEN),
             # weighted and undirected
             Button("MST", 15, (830, 35, 150, 40), Colors.GREEN, Colors.DARK_GREEN),
             # directed
@@ -45,6 +48,14 @@ class ButtonsBar:
         for button in self.buttons:
             button.draw(win)
 
+    def state(self) -> tuple:
+        """
+        :return: everything that affects how the bar looks, hover included
+        """
+        for button in self.buttons:
+            button.is_mouse(None)
+        return tuple((button.text, button.current_color, button.active) for button in self.buttons)
+
     def get_clicked_button(self, event: pygame.event) -> Button:
         for button in self.buttons:
             if button.is_mouse(event) and button.active:
@@ -77,6 +88,34 @@ class ButtonsBar:
                 else:
                     button.active = False
 
+    def next_path_mode(self, button: Button):
+        """
+        switches shortest path variant shown on the mode button
+        """
+        self.path_mode = PathMode.ALL[(PathMode.ALL.index(self.path_mode) + 1) % len(PathMode.ALL)]
+        button.change_text(self.path_mode)
+
+    def sync_graph_state(self, graph: Graph):
+        """
+        sets DIRECTED / WEIGHTED toggles to match graph, needed after loading
+        """
+        for button in self.buttons:
+            if button.text.endswith("DIRECTED"):
+                self.set_toggle(button, graph.directing, "DIRECTED", "UNDIRECTED")
+            if button.text.endswith("WEIGHTED"):
+                self.set_toggle(button, graph.weighted, "WEIGHTED", "UNWEIGHTED")
+
+    @staticmethod
+    def set_toggle(button: Button, on: bool, on_text: str, off_text: str):
+        if on:
+            button.change_text(on_text)
+            button.color = Colors.GREEN
+            button.hover_color = Colors.DARK_GREEN
+        else:
+            button.change_text(off_text)
+            button.color = Colors.RED
+            button.hover_color = Colors.DARK_RED
+
     def draw_node_choosing(self, win: pygame.Surface, clock: pygame.time.Clock, graph: Graph, text: str,
                            mouse_color: Tuple[int, int, int]) -> int:
         start_node = None
@@ -90,9 +129,9 @@ class ButtonsBar:
             pos = pygame.mouse.get_pos()
             graph.hover_nodes_on_mouse(pos)
 
+            graph.draw(win)
             pygame.draw.rect(win, self.color, self.rect)
             text_button.draw(win)
-            graph.draw(win)
             pygame.draw.circle(win, mouse_color, pos, 10)
 
             for event in pygame.event.get():
@@ -115,3 +154,16 @@ class ButtonsBar:
         file_path = tkinter.filedialog.askopenfilename(parent=t)
         t.destroy()
         return file_path
+
+    @staticmethod
+    def choose_save_file_dialog() -> str:
+        """
+        pops save window for graph snapshot
+        :return: full choosen file path
+        """
+        t = tkinter.Tk()
+        t.withdraw()
+        file_path = tkinter.filedialog.asksaveasfilename(parent=t, defaultextension=".gvs",
+                                                         filetypes=[("Graph snapshot", "*.gvs")])
+        t.destroy()
+        return file_path
@@ -0,0 +1,70 @@
+from typing import Tuple
+
+import pygame
+
+from src.layout import Bounds
+
+
+class Camera:
+    """
+    world -> screen transform, screen = (world - (x, y)) * zoom,
+    with no pan and zoom 1 world coordinates are screen pixels
+    """
+
+    MIN_ZOOM = 0.02
+    MAX_ZOOM = 3.0
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+
+    def state(self) -> Tuple[float, float, float]:
+        return self.x, self.y, self.zoom
+
+    def to_screen(self, pos: Tuple[float, float]) -> Tuple[int, int]:
+        return round((pos[0] - self.x) * self.zoom), round((pos[1] - self.y) * self.zoom)
+
+    def to_world(self, pos: Tuple[float, float]) -> Tuple[int, int]:
+        return round(pos[0] / self.zoom + self.x), round(pos[1] / self.zoom + self.y)
+
+    def rect_to_screen(self, rect: pygame.Rect) -> pygame.Rect:
+        """
+        :return: screen rect covering world rect, one pixel larger to absorb rounding
+        """
+        left, top = self.to_screen(rect.topleft)
+        right, bottom = self.to_screen(rect.bottomright)
+        return pygame.Rect(left - 1, top - 1, right - left + 2, bottom - top + 2)
+
+    def rect_to_world(self, rect: pygame.Rect) -> pygame.Rect:
+        left, top = self.to_world(rect.topleft)
+        right, bottom = self.to_world(rect.bottomright)
+        return pygame.Rect(left - 1, top - 1, right - left + 2, bottom - top + 2)
+
+    def pan(self, dx: float, dy: float):
+        """
+        moves view by screen pixels, content follows the mouse
+        """
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+
+    def zoom_at(self, pos: Tuple[float, float], factor: float):
+        """
+        zooms keeping the world point under screen position pos in place
+        """
+        zoom = min(max(self.zoom * factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        world_x = pos[0] / self.zoom + self.x
+        world_y = pos[1] / self.zoom + self.y
+        self.zoom = zoom
+        self.x = world_x - pos[0] / zoom
+        self.y = world_y - pos[1] / zoom
+
+    def fit(self, bounds: Bounds, viewport: pygame.Rect):
+        """
+        shows whole world bounds centered in viewport, zoom is never increased above 1
+        """
+        left, top, right, bottom = bounds
+        zoom = min(viewport.w / max(right - left, 1), viewport.h / max(bottom - top, 1), 1.0)
+        self.zoom = max(zoom, self.MIN_ZOOM)
+        self.x = (left + right) / 2 - viewport.centerx / self.zoom
+        self.y = (top + bottom) / 2 - viewport.centery / self.zoom
@@ -1,7 +1,11 @@
+import colorsys
+from typing import List, Tuple
+
 WIDTH = 1000
 HEIGHT = 750
 FPS = 60
 INFINITY = 1_000_000_000
+LAYOUT_BUDGET_MS = 8
 
 
 class Colors:
@@ -18,3 +22,41 @@ class Colors:
     YELLOW = (200, 200, 50)
     CYAN = (0, 255, 255)
     PINK = (255, 20, 150)
+
+    @staticmethod
+    def palette(k: int) -> List[Tuple[int, int, int]]:
+        """
+        k distinct looking colors in O(k), hues are spread by the golden ratio
+        so consecutive colors are never similar
+        """
+        colors = []
+        for i in range(k):
+            r, g, b = colorsys.hsv_to_rgb(i * 0.618033988749895 % 1, 0.75 - 0.125 * (i % 3), 0.95 - 0.2 * (i % 2))
+            colors.append((int(r * 255), int(g * 255), int(b * 255)))
+        return colors
+
+
+class PathMode:
+    """
+    shortest path variants, values are labels of the mode button next to DIJKSTRA
+    """
+    DIJKSTRA = "D"
+    A_STAR = "A*"
+    BIDIRECTIONAL = "BI"  # also makes BFS ask for an end vertex
+    ALL = (DIJKSTRA, A_STAR, BIDIRECTIONAL)
+
+
+class Detail:
+    """
+    level of detail thresholds, density is number of vertices per 100x100 px of the graph area
+    """
+    POINTS = 0  # vertices as points, thin edges or edge heatmap
+    SIMPLE = 1  # plain circles and thin edges, no labels, arrows or borders
+    FULL = 2
+
+    SIMPLE_SCALE = 0.5
+    SIMPLE_DENSITY = 1.5
+    POINTS_SCALE = 0.25
+    POINTS_DENSITY = 6.0
+    HEATMAP_EDGES = 20_000  # at POINTS level more edges than this are drawn as density heatmap
+    HEATMAP_CELL = 6
@@ -0,0 +1,108 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class CSRGraph:
+    """
+    compressed sparse row representation shared by all algorithms,
+    vertices are indexed 0..n-1 and edge ids are positions in Graph.edge_arr
+    """
+
+    def __init__(self, ids: Iterable[int], edges: Iterable[Tuple[int, int, int]]):
+        """
+        :param ids: vertex numbers
+        :param edges: (start number, end number, weight) in edge id order
+        """
+        self.ids = array('q', ids)
+        self.index: Dict[int, int] = {v: i for i, v in enumerate(self.ids)}
+
+        self.src = array('q')
+        self.dst = array('q')
+        self.weights = array('q')
+        for a, b, w in edges:
+            for v in (a, b):
+                if v not in self.index:
+                    self.index[v] = len(self.ids)
+                    self.ids.append(v)
+            self.src.append(self.index[a])
+            self.dst.append(self.index[b])
+            self.weights.append(int(w))
+
+        self.n = len(self.ids)
+        self.m = len(self.src)
+        self.out_offsets, self.out_targets, self.out_edges = self.build_rows(self.src, self.dst)
+        self.in_offsets, self.in_sources, self.in_edges = self.build_rows(self.dst, self.src)
+
+    def build_rows(self, rows: array, cols: array) -> Tuple[array, array, array]:
+        """
+        counting sort of edges by row, keeps edge id order inside a row
+        """
+        offsets = array('q', bytes(8 * (self.n + 1)))
+        for r in rows:
+            offsets[r + 1] += 1
+        for i in range(self.n):
+            offsets[i + 1] += offsets[i]
+        fill = array('q', offsets)
+        targets = array('q', bytes(8 * self.m))
+        edge_ids = array('q', bytes(8 * self.m))
+        for e in range(self.m):
+            r = rows[e]
+            k = fill[r]
+            targets[k] = cols[e]
+            edge_ids[k] = e
+            fill[r] = k + 1
+        return offsets, targets, edge_ids
+
+    def view(self, directed: bool, transposed: bool = False) -> 'CSRView':
+        return CSRView(self, directed, transposed)
+
+    def vertex_ids(self, indices: Iterable[int]) -> List[int]:
+        return [self.ids[i] for i in indices]
+
+
+class CSRView:
+    """
+    directed, transposed or undirected view over the same CSR buffers
+    """
+
+    def __init__(self, csr: CSRGraph, directed: bool, transposed: bool = False):
+        self.csr = csr
+        self.directed = directed
+        self.transposed = transposed
+        if transposed:
+            self.offsets, self.targets, self.edges = csr.in_offsets, csr.in_sources, csr.in_edges
+            self.back_offsets, self.back_targets, self.back_edges = csr.out_offsets, csr.out_targets, csr.out_edges
+        else:
+            self.offsets, self.targets, self.edges = csr.out_offsets, csr.out_targets, csr.out_edges
+            self.back_offsets, self.back_targets, self.back_edges = csr.in_offsets, csr.in_sources, csr.in_edges
+
+    def neighbors(self, v: int) -> Iterator[Tuple[int, int]]:
+        """
+        yields (neighbour index, edge id), undirected view merges both rows by edge id
+        so neighbours come in the order edges were added
+        """
+        targets, edges = self.targets, self.edges
+        k, end = self.offsets[v], self.offsets[v + 1]
+        if self.directed:
+            for k in range(k, end):
+                yield targets[k], edges[k]
+            return
+        back_targets, back_edges = self.back_targets, self.back_edges
+        j, back_end = self.back_offsets[v], self.back_offsets[v + 1]
+        while k < end and j < back_end:
+            if edges[k] <= back_edges[j]:
+                yield targets[k], edges[k]
+                k += 1
+            else:
+                yield back_targets[j], back_edges[j]
+                j += 1
+        for k in range(k, end):
+            yield targets[k], edges[k]
+        for j in range(j, back_end):
+            yield back_targets[j], back_edges[j]
+
+    def degree(self, v: int) -> int:
+        d = self.offsets[v + 1] - self.offsets[v]
+        if not self.directed:
+            d += self.back_offsets[v + 1] - self.back_offsets[v]
+        return d
@@ -0,0 +1,553 @@
+import heapq
+import math
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
+
+from src.constants import INFINITY, Colors
+from src.csr import CSRGraph, CSRView
+from src.mst import MSTMethod, minimum_spanning_forest
+from src.worker import CHECK_INTERVAL, checkpoint
+
+
+class DfsEvent:
+    PRE = 'in'
+    POST = 'out'
+    TREE = 'tree'
+    BACK = 'back'
+    FORWARD = 'forward'
+    CROSS = 'cross'
+
+
+class VertexEntered(NamedTuple):
+    vertex: int
+
+
+class VertexFinished(NamedTuple):
+    vertex: int
+
+
+class VertexVisited(NamedTuple):
+    vertex: int
+    dist: int
+
+
+class ComponentFound(NamedTuple):
+    index: int
+    vertices: List[int]
+
+
+class Condensation(NamedTuple):
+    centers: List[Tuple[int, int]]  # centroid of every component, by component index - 1
+    src: List[int]  # component indices of edges between components
+    dst: List[int]
+    weights: List[int]
+    colors: Dict[int, Tuple[int, int, int]]  # SCC view color of components with more than one vertex
+
+
+class EdgeAccepted(NamedTuple):
+    edge: int
+    weight: int
+
+
+class VertexSettled(NamedTuple):
+    vertex: int
+    dist: int
+
+
+class FrontierSettled(NamedTuple):
+    vertex: int
+    dist: int
+    backward: bool  # reached by the search from the end
+
+
+class PathFound(NamedTuple):
+    vertices: List[int]
+    edges: List[int]
+    dist: int
+    settled: int = 0
+
+
+class NoPath(NamedTuple):
+    start: int
+    end: int
+    settled: int = 0
+
+
+class BridgeFound(NamedTuple):
+    edge: int
+
+
+class ArticulationPointFound(NamedTuple):
+    vertex: int
+
+
+class BlockFound(NamedTuple):
+    index: int
+    vertices: List[int]
+    edges: List[int]
+
+
+class TwoEdgeComponentFound(NamedTuple):
+    index: int
+    vertices: List[int]
+
+
+BiconnectivityStep = Union[BridgeFound, ArticulationPointFound, BlockFound, TwoEdgeComponentFound]
+
+
+def dfs_events(view: CSRView, roots: Sequence[int], visited: List[bool] = None) \
+        -> Iterator[Tuple[str, int, int, int]]:
+    """
+    iterative dfs over CSR view, yields (event, v, u, edge id):
+    PRE and POST events carry vertex v and its dfs parent u (-1 for roots) with the tree edge,
+    edge events carry the classified edge v -> u,
+    in undirected view only the tree edge to the parent is skipped, so parallel edges are back edges
+    :param visited: shared visited flags, vertices already marked are not entered
+    """
+    n = view.csr.n
+    if visited is None:
+        visited = [False] * n
+    pre = [0] * n
+    finished = [False] * n
+    counter = 0
+    for root in roots:
+        if visited[root]:
+            continue
+        visited[root] = True
+        counter += 1
+        pre[root] = counter
+        yield DfsEvent.PRE, root, -1, -1
+        stack = [(root, -1, -1, view.neighbors(root))]
+        while stack:
+            v, parent, parent_edge, it = stack[-1]
+            for u, e in it:
+                if not visited[u]:
+                    visited[u] = True
+                    counter += 1
+                    pre[u] = counter
+                    yield DfsEvent.TREE, v, u, e
+                    yield DfsEvent.PRE, u, v, e
+                    stack.append((u, v, e, view.neighbors(u)))
+                    break
+                if view.directed:
+                    if not finished[u]:
+                        yield DfsEvent.BACK, v, u, e
+                    elif pre[v] < pre[u]:
+                        yield DfsEvent.FORWARD, v, u, e
+                    else:
+                        yield DfsEvent.CROSS, v, u, e
+                elif e != parent_edge and not finished[u]:
+                    yield DfsEvent.BACK, v, u, e
+            else:
+                stack.pop()
+                finished[v] = True
+                yield DfsEvent.POST, v, parent, parent_edge
+
+
+def dfs_steps(csr: CSRGraph, start: int, directed: bool) -> Iterator[Union[VertexEntered, VertexFinished]]:
+    ids = csr.ids
+    for event, v, _, _ in dfs_events(csr.view(directed), [csr.index[start]]):
+        if event == DfsEvent.PRE:
+            yield VertexEntered(ids[v])
+        elif event == DfsEvent.POST:
+            yield VertexFinished(ids[v])
+
+
+def bfs_steps(csr: CSRGraph, start: int, directed: bool) -> Iterator[VertexVisited]:
+    view = csr.view(directed)
+    ids = csr.ids
+    dist = [-1] * csr.n
+    v = csr.index[start]
+    q = deque([v])
+    dist[v] = 0
+    while len(q) > 0:
+        v = q.popleft()
+        yield VertexVisited(ids[v], dist[v])
+        for u, _ in view.neighbors(v):
+            if dist[u] == -1:
+                q.append(u)
+                dist[u] = dist[v] + 1
+
+
+def scc_steps(csr: CSRGraph) -> Iterator[ComponentFound]:
+    """
+    Tarjan's algorithm as one iterative DFS over out rows, no transposed graph is needed,
+    components are yielded in topological order of the condensation
+    """
+    offsets, targets = csr.out_offsets, csr.out_targets
+    order = [-1] * csr.n  # DFS preorder number
+    low = [0] * csr.n
+    on_stack = [False] * csr.n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(csr.n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, offsets[root])]
+        while work:
+            v, k = work[-1]
+            end = offsets[v + 1]
+            while k < end:
+                u = targets[k]
+                k += 1
+                if order[u] == -1:
+                    work[-1] = (v, k)
+                    order[u] = low[u] = counter
+                    counter += 1
+                    if counter % CHECK_INTERVAL == 0:
+                        checkpoint(counter, csr.n)
+                    stack.append(u)
+                    on_stack[u] = True
+                    work.append((u, offsets[u]))
+                    break
+                if on_stack[u] and order[u] < low[v]:
+                    low[v] = order[u]
+            else:
+                work.pop()
+                if work and low[v] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[v]
+                if low[v] == order[v]:
+                    component = []
+                    u = -1
+                    while u != v:
+                        u = stack.pop()
+                        on_stack[u] = False
+                        component.append(u)
+                    components.append(component)
+
+    # Tarjan's algorithm finds sink components first
+    ids = csr.ids
+    for index, component in enumerate(reversed(components), 1):
+        yield ComponentFound(index, [ids[v] for v in component])
+
+
+def mst_steps(csr: CSRGraph, method: str = MSTMethod.KRUSKAL) -> Iterator[EdgeAccepted]:
+    """
+    yields edges of minimum spanning forest, see src.mst for methods
+    """
+    weights = csr.weights
+    for e in minimum_spanning_forest(csr.n, csr.src, csr.dst, weights, method=method):
+        yield EdgeAccepted(e, weights[e])
+
+
+def condense(csr: CSRGraph, components: List[ComponentFound],
+             positions: Tuple[Sequence[float], Sequence[float]]) -> Condensation:
+    """
+    centroids of strongly connected components and edges between them,
+    parallel edges between two components are merged into one with the smallest weight
+    :param components: scc_steps of csr
+    :param positions: x and y of vertices by index
+    """
+    xs, ys = positions
+    index = csr.index
+    component_of = [0] * csr.n
+    centers = []
+    palette = Colors.palette(len(components))
+    colors = {}
+    for step in components:
+        members = [index[v] for v in step.vertices]
+        for v in members:
+            component_of[v] = step.index
+        centers.append((sum(xs[v] for v in members) // len(members), sum(ys[v] for v in members) // len(members)))
+        if len(members) > 1:
+            colors[step.index] = palette[step.index - 1]
+        if step.index % CHECK_INTERVAL == 0:
+            checkpoint(step.index, len(components))
+    src, dst, weights = csr.src, csr.dst, csr.weights
+    lightest: Dict[Tuple[int, int], int] = {}
+    for e in range(csr.m):
+        if e % CHECK_INTERVAL == 0:
+            checkpoint(e, csr.m)
+        key = (component_of[src[e]], component_of[dst[e]])
+        if key[0] != key[1]:
+            lightest[key] = min(lightest.get(key, weights[e]), weights[e])
+    return Condensation(centers, [a for a, _ in lightest], [b for _, b in lightest], list(lightest.values()), colors)
+
+
+def dijkstra_steps(csr: CSRGraph, start: int, end: int, directed: bool,
+                   positions: Tuple[Sequence[float], Sequence[float]] = None, per_length: float = None) \
+        -> Iterator[Union[VertexSettled, PathFound, NoPath]]:
+    """
+    heap is ordered by tentative distance, stale entries are skipped when popped,
+    search stops as soon as end is settled
+    :param positions: x and y of vertices by index, turns the search into A*
+    :param per_length: weight_per_length of these positions, computed here if not given
+    """
+    view = csr.view(directed)
+    ids, weights = csr.ids, csr.weights
+    start_number, end_number = start, end
+    start, end = csr.index[start], csr.index[end]
+    dist = [INFINITY] * csr.n
+    visited = [False] * csr.n
+    pred_edge = [-1] * csr.n
+    heuristic = None
+    if positions:
+        if per_length is None:
+            per_length = weight_per_length(csr, positions)
+        heuristic = astar_heuristic(positions, end, per_length)
+    settled = 0
+
+    pq = [(0, start)]
+    dist[start] = 0
+    while len(pq) > 0:
+        v = heapq.heappop(pq)[1]
+        if visited[v]:
+            continue
+        visited[v] = True
+        settled += 1
+        if v == end:
+            yield construct_path(csr, pred_edge, start, end, dist[end], settled)
+            return
+        yield VertexSettled(ids[v], dist[v])
+        for u, e in view.neighbors(v):
+            d = dist[v] + weights[e]
+            if d < dist[u]:
+                dist[u] = d
+                pred_edge[u] = e
+                heapq.heappush(pq, (d + heuristic(u) if heuristic else d, u))
+    yield NoPath(start_number, end_number, settled)
+
+
+def weight_per_length(csr: CSRGraph, positions: Tuple[Sequence[float], Sequence[float]]) -> float:
+    """
+    smallest weight per unit of edge length, scans every edge, so callers cache it per graph and layout
+    """
+    xs, ys = positions
+    src, dst, weights = csr.src, csr.dst, csr.weights
+    per_length = min((weights[e] / math.hypot(xs[src[e]] - xs[dst[e]], ys[src[e]] - ys[dst[e]])
+                      for e in range(csr.m) if xs[src[e]] != xs[dst[e]] or ys[src[e]] != ys[dst[e]]),
+                     default=0.0)
+    return max(per_length, 0.0)
+
+
+def astar_heuristic(positions: Tuple[Sequence[float], Sequence[float]], end: int, per_length: float):
+    """
+    straight line distance to end times the smallest weight per unit of edge length,
+    never more than the remaining path weight and consistent, so A* settles vertices only once
+    :return: function of vertex index
+    """
+    xs, ys = positions
+    end_x, end_y = xs[end], ys[end]
+    return lambda v: per_length * math.hypot(xs[v] - end_x, ys[v] - end_y)
+
+
+def bidirectional_steps(csr: CSRGraph, start: int, end: int, directed: bool, weighted: bool) \
+        -> Iterator[Union[FrontierSettled, PathFound, NoPath]]:
+    """
+    searches forward from start and backward from end over transposed edges until the frontiers meet,
+    Dijkstra's algorithm on both sides if weighted, BFS a whole level at a time otherwise
+    """
+    s, t = csr.index[start], csr.index[end]
+    if s == t:
+        yield PathFound([start], [], 0, 1)
+        return
+    views = (csr.view(directed), csr.view(directed, transposed=True))
+    dist = ([INFINITY] * csr.n, [INFINITY] * csr.n)
+    pred_edge = ([-1] * csr.n, [-1] * csr.n)
+    dist[0][s] = 0
+    dist[1][t] = 0
+    search = bidirectional_dijkstra if weighted else bidirectional_bfs
+    best, meet, settled = yield from search(csr, views, dist, pred_edge, s, t)
+    if meet == -1:
+        yield NoPath(start, end, settled)
+        return
+
+    src, dst = csr.src, csr.dst
+    vertices = [meet]
+    edges = []
+    for side, goal in ((0, s), (1, t)):
+        if side == 1:
+            vertices.reverse()
+            edges.reverse()
+        v = meet
+        while v != goal:
+            e = pred_edge[side][v]
+            edges.append(e)
+            v = src[e] if src[e] != v else dst[e]
+            vertices.append(v)
+    yield PathFound([csr.ids[v] for v in vertices], edges, best, settled)
+
+
+def bidirectional_dijkstra(csr: CSRGraph, views: Tuple[CSRView, CSRView], dist: Tuple[List[int], List[int]],
+                           pred_edge: Tuple[List[int], List[int]], s: int, t: int) \
+        -> Iterator[FrontierSettled]:
+    """
+    settles from the side with the nearer frontier, stops when the two frontier distances
+    add up to at least the best path seen across them
+    :return: (best distance, vertex where paths meet or -1, number of settled vertices)
+    """
+    ids, weights = csr.ids, csr.weights
+    heaps = ([(0, s)], [(0, t)])
+    done = ([False] * csr.n, [False] * csr.n)
+    best, meet = INFINITY, -1
+    settled = 0
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, v = heapq.heappop(heaps[side])
+        if done[side][v]:
+            continue
+        done[side][v] = True
+        settled += 1
+        yield FrontierSettled(ids[v], d, side == 1)
+        mine, other = dist[side], dist[1 - side]
+        for u, e in views[side].neighbors(v):
+            du = d + weights[e]
+            if du < mine[u]:
+                mine[u] = du
+                pred_edge[side][u] = e
+                heapq.heappush(heaps[side], (du, u))
+            if other[u] != INFINITY and mine[u] + other[u] < best:
+                best, meet = mine[u] + other[u], u
+    return best, meet, settled
+
+
+def bidirectional_bfs(csr: CSRGraph, views: Tuple[CSRView, CSRView], dist: Tuple[List[int], List[int]],
+                      pred_edge: Tuple[List[int], List[int]], s: int, t: int) \
+        -> Iterator[FrontierSettled]:
+    """
+    expands the smaller frontier by one level, the first level on which the searches meet
+    contains a shortest path
+    :return: (best distance, vertex where paths meet or -1, number of expanded vertices)
+    """
+    ids = csr.ids
+    frontiers = [[s], [t]]
+    best, meet = INFINITY, -1
+    settled = 0
+    while frontiers[0] and frontiers[1] and meet == -1:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other = dist[side], dist[1 - side]
+        next_frontier = []
+        for v in frontiers[side]:
+            settled += 1
+            yield FrontierSettled(ids[v], mine[v], side == 1)
+            for u, e in views[side].neighbors(v):
+                if mine[u] == INFINITY:
+                    mine[u] = mine[v] + 1
+                    pred_edge[side][u] = e
+                    next_frontier.append(u)
+                if other[u] != INFINITY and mine[u] + other[u] < best:
+                    best, meet = mine[u] + other[u], u
+        frontiers[side] = next_frontier
+    return best, meet, settled
+
+
+def construct_path(csr: CSRGraph, pred_edge: List[int], start: int, end: int, dist: int,
+                   settled: int = 0) -> PathFound:
+    vertices = [end]
+    edges = []
+    v = end
+    while v != start:
+        e = pred_edge[v]
+        edges.append(e)
+        v = csr.src[e] if csr.src[e] != v else csr.dst[e]
+        vertices.append(v)
+    vertices.reverse()
+    edges.reverse()
+    return PathFound([csr.ids[v] for v in vertices], edges, dist, settled)
+
+
+def biconnectivity_steps(csr: CSRGraph) -> Iterator[BiconnectivityStep]:
+    """
+    one low-link pass over all components of the undirected graph, finds bridges, articulation points,
+    biconnected blocks (loops are left out) and 2-edge-connected components, O(n + m)
+    """
+    ids, src, dst = csr.ids, csr.src, csr.dst
+    pre = [0] * csr.n
+    low = [0] * csr.n
+    is_art_point = [False] * csr.n
+    root = -1
+    root_children = 0
+    pre_counter = 0
+    edge_stack: List[int] = []
+    vertex_stack: List[int] = []
+    blocks = 0
+    components = 0
+    for event, v, u, e in dfs_events(csr.view(False), range(csr.n)):
+        if event == DfsEvent.PRE:
+            pre_counter += 1
+            pre[v] = low[v] = pre_counter
+            if pre_counter % CHECK_INTERVAL == 0:
+                checkpoint(pre_counter, csr.n)
+            vertex_stack.append(v)
+            if u == -1:
+                root = v
+                root_children = 0
+        elif event == DfsEvent.TREE:
+            edge_stack.append(e)
+        elif event == DfsEvent.BACK and u != v:
+            edge_stack.append(e)
+            low[v] = min(low[v], pre[u])
+        elif event == DfsEvent.POST:
+            if u != -1:
+                low[u] = min(low[u], low[v])
+            if u == -1 or low[v] > pre[u]:
+                # v with its subtree, minus components split off earlier, is cut off by a bridge or is the whole tree
+                if u != -1:
+                    yield BridgeFound(e)
+                components += 1
+                component = []
+                w = -1
+                while w != v:
+                    w = vertex_stack.pop()
+                    component.append(ids[w])
+                yield TwoEdgeComponentFound(components, component)
+            if u == -1:
+                if root_children > 1:
+                    yield ArticulationPointFound(ids[v])
+            elif low[v] >= pre[u]:
+                # edges from tree edge u - v up to the top of the stack form one block
+                blocks += 1
+                block_edges = []
+                f = -1
+                while f != e:
+                    f = edge_stack.pop()
+                    block_edges.append(f)
+                block_vertices = list(dict.fromkeys(ids[x] for f in block_edges for x in (src[f], dst[f])))
+                yield BlockFound(blocks, block_vertices, block_edges)
+                if u == root:
+                    root_children += 1
+                elif not is_art_point[u]:
+                    is_art_point[u] = True
+                    yield ArticulationPointFound(ids[u])
+
+
+class BlockCutTree:
+    """
+    bipartite forest of biconnected blocks and articulation points,
+    every block is joined with the articulation points it contains, blocks are keyed by BlockFound.index
+    """
+
+    def __init__(self, steps: Iterable[BiconnectivityStep]):
+        self.blocks: Dict[int, List[int]] = {}  # block index -> vertex numbers
+        self.block_edges: Dict[int, List[int]] = {}  # block index -> edge ids
+        self.articulation_points: List[int] = []
+        for step in steps:
+            if isinstance(step, BlockFound):
+                self.blocks[step.index] = step.vertices
+                self.block_edges[step.index] = step.edges
+            elif isinstance(step, ArticulationPointFound):
+                self.articulation_points.append(step.vertex)
+        self.vertex_blocks: Dict[int, List[int]] = {v: [] for v in self.articulation_points}
+        for i, block in self.blocks.items():
+            for v in block:
+                if v in self.vertex_blocks:
+                    self.vertex_blocks[v].append(i)
+
+    def edges(self) -> List[Tuple[int, int]]:
+        """
+        :return: tree edges as (block index, articulation point number)
+        """
+        return [(i, v) for v, blocks in self.vertex_blocks.items() for i in blocks]
+
+    def blocks_of(self, v: int) -> List[int]:
+        """
+        :return: indexes of blocks containing vertex v, more than one only for articulation points
+        """
+        if v in self.vertex_blocks:
+            return self.vertex_blocks[v]
+        return [i for i, block in self.blocks.items() if v in block]
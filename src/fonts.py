@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import pygame
+
+pygame.init()
+
+FONT_NAME = 'freesansbold.ttf'
+TEXT_CACHE_SIZE = 4096
+
+
+class TextCache:
+    """
+    process-wide font registry and LRU cache of rendered labels
+    """
+
+    def __init__(self, max_size: int = TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.fonts: Dict[int, pygame.font.Font] = {}
+        self.surfaces: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, size: int) -> pygame.font.Font:
+        size = max(int(size), 1)
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(FONT_NAME, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text: str, size: int, color: Tuple[int, int, int], antialias: bool = True) -> pygame.Surface:
+        """
+        returns rendered text surface, rendering it only on cache miss
+        """
+        key = (text, max(int(size), 1), tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.get_font(key[1]).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """
+        drops rendered labels, called when Graph.scale changes
+        """
+        self.surfaces.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces), "fonts": len(self.fonts)}
+
+
+text_cache = TextCache()
+
+
+def render_text(text: str, size: int, color: Tuple[int, int, int], antialias: bool = True) -> pygame.Surface:
+    return text_cache.render(text, size, color, antialias)
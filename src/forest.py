@@ -0,0 +1,326 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, Tuple
+
+from src.mst import minimum_spanning_forest
+from src.worker import CHECK_INTERVAL, Cancelled, checkpoint
+
+EdgeKey = Tuple[float, int]  # (weight, edge id), edge id breaks ties like stable sort in Kruskal's algorithm
+NO_EDGE: EdgeKey = (float('-inf'), -1)
+
+
+class UnionFind:
+    """
+    union-find over vertex numbers, vertices are added on first use
+    """
+
+    def __init__(self):
+        self.rep: Dict[int, int] = {}
+        self.set_size: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, a: int):
+        if a not in self.rep:
+            self.rep[a] = a
+            self.set_size[a] = 1
+            self.count += 1
+
+    def find(self, a: int) -> int:
+        self.add(a)
+        root = a
+        while self.rep[root] != root:
+            root = self.rep[root]
+        while self.rep[a] != root:
+            self.rep[a], a = root, self.rep[a]
+        return root
+
+    def join(self, a: int, b: int) -> bool:
+        """
+        :return: False if a and b were already in one set
+        """
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+        if self.set_size[a] > self.set_size[b]:
+            a, b = b, a
+        self.set_size[b] += self.set_size[a]
+        self.rep[a] = b
+        self.count -= 1
+        return True
+
+
+class LinkCutTrees:
+    """
+    link-cut trees, nodes are vertices and forest edges, every edge node sits between its two vertices,
+    so the node with maximum key on a path is its heaviest edge, operations are amortized O(log n)
+    """
+
+    def __init__(self):
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.parent: List[int] = []  # splay parent, or path parent for root of a splay tree
+        self.flip: List[bool] = []
+        self.key: List[EdgeKey] = []
+        self.best: List[int] = []  # node with maximum key in splay subtree
+
+    def new_node(self, key: EdgeKey = NO_EDGE, parent: int = -1) -> int:
+        x = len(self.key)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.parent.append(parent)
+        self.flip.append(False)
+        self.key.append(key)
+        self.best.append(x)
+        return x
+
+    def is_root(self, x: int) -> bool:
+        p = self.parent[x]
+        return p == -1 or (self.left[p] != x and self.right[p] != x)
+
+    def push(self, x: int):
+        if self.flip[x]:
+            self.flip[x] = False
+            a, b = self.left[x], self.right[x]
+            self.left[x], self.right[x] = b, a
+            if a != -1:
+                self.flip[a] = not self.flip[a]
+            if b != -1:
+                self.flip[b] = not self.flip[b]
+
+    def pull(self, x: int):
+        key, best = self.key, self.best
+        b = x
+        for child in (self.left[x], self.right[x]):
+            if child != -1 and key[best[child]] > key[b]:
+                b = best[child]
+        best[x] = b
+
+    def rotate(self, x: int):
+        left, right, parent = self.left, self.right, self.parent
+        p = parent[x]
+        g = parent[p]
+        if not self.is_root(p):
+            if left[g] == p:
+                left[g] = x
+            else:
+                right[g] = x
+        parent[x] = g
+        if left[p] == x:
+            child = right[x]
+            left[p] = child
+            right[x] = p
+        else:
+            child = left[x]
+            right[p] = child
+            left[x] = p
+        if child != -1:
+            parent[child] = p
+        parent[p] = x
+        self.pull(p)
+        self.pull(x)
+
+    def splay(self, x: int):
+        path = [x]
+        while not self.is_root(path[-1]):
+            path.append(self.parent[path[-1]])
+        for y in reversed(path):
+            self.push(y)
+        while not self.is_root(x):
+            p = self.parent[x]
+            if not self.is_root(p):
+                g = self.parent[p]
+                self.rotate(p if (self.left[g] == p) == (self.left[p] == x) else x)
+            self.rotate(x)
+
+    def access(self, x: int):
+        """
+        makes root to x the preferred path, x ends as root of its splay tree
+        """
+        last = -1
+        y = x
+        while y != -1:
+            self.splay(y)
+            self.right[y] = last
+            self.pull(y)
+            last = y
+            y = self.parent[y]
+        self.splay(x)
+
+    def make_root(self, x: int):
+        self.access(x)
+        self.flip[x] = not self.flip[x]
+
+    def find_root(self, x: int) -> int:
+        self.access(x)
+        while True:
+            self.push(x)
+            if self.left[x] == -1:
+                break
+            x = self.left[x]
+        self.splay(x)
+        return x
+
+    def link(self, x: int, y: int):
+        """
+        x and y must be in different trees
+        """
+        self.make_root(x)
+        self.parent[x] = y
+
+    def cut(self, x: int, y: int):
+        """
+        x and y must be neighbours
+        """
+        self.make_root(x)
+        self.access(y)
+        self.left[y] = -1
+        self.parent[x] = -1
+        self.pull(y)
+
+    def path_max(self, x: int, y: int) -> int:
+        """
+        :return: node with maximum key on path x - y, x and y must be in one tree
+        """
+        self.make_root(x)
+        self.access(y)
+        return self.best[y]
+
+
+class SpanningForest:
+    """
+    connected components and minimum spanning forest maintained as edges are added,
+    components are updated at once, new edges wait in pending until the forest is asked for,
+    a few are inserted one by one (link, or replace the heaviest edge on the cycle they close),
+    big batches are merged with the current forest by Kruskal's algorithm
+    """
+
+    REBUILD_RATIO = 32  # rebuild when pending * REBUILD_RATIO > forest size
+
+    def __init__(self):
+        self.components = UnionFind()
+        self.tree: Dict[int, Tuple[int, int, EdgeKey]] = {}  # edge id -> (a, b, key)
+        self.pending: List[Tuple[EdgeKey, int, int]] = []
+        self.trees = None  # LinkCutTrees, built from tree on first single insertion
+        self.vertex_node: Dict[int, int] = {}
+        self.edge_node: Dict[int, int] = {}
+        self.lock = threading.Lock()  # edges() of a cancelled job may still run when the next one starts
+        self.pending_lock = threading.Lock()  # edges are added on the main loop while edges() runs on a worker
+
+    def add_vertex(self, a: int):
+        self.components.add(a)
+
+    def add_edge(self, edge_id: int, a: int, b: int, weight: int):
+        self.components.join(a, b)
+        if a != b:
+            with self.pending_lock:
+                self.pending.append(((weight, edge_id), a, b))
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.components.find(a) == self.components.find(b)
+
+    def component_count(self) -> int:
+        return self.components.count
+
+    def edges(self) -> List[int]:
+        """
+        may run on a worker thread while edges are added, pending edges are taken at once,
+        later ones wait for the next call, so do edges not merged yet when the job is cancelled
+        :return: ids of minimum spanning forest edges
+        """
+        with self.lock:
+            with self.pending_lock:
+                pending, self.pending = self.pending, []
+            merged = 0
+            try:
+                if len(pending) * self.REBUILD_RATIO > len(self.tree):
+                    self.rebuild(pending)
+                    merged = len(pending)
+                else:
+                    for key, a, b in pending:
+                        if merged % CHECK_INTERVAL == 0:
+                            checkpoint(merged, len(pending))
+                        self.insert(key, a, b)
+                        merged += 1
+            except Cancelled:
+                with self.pending_lock:
+                    self.pending[:0] = pending[merged:]
+                raise
+            return list(self.tree)
+
+    def rebuild(self, pending: List[Tuple[EdgeKey, int, int]]):
+        """
+        minimum spanning forest of forest and pending edges, edges left out of the forest never come back,
+        stops as soon as every component is spanned
+        """
+        # count is read first, components joined meanwhile can only raise target, which just stops later
+        count = self.components.count
+        target = len(self.components.rep) - count
+        edges = list(self.tree.values())
+        edges.extend((a, b, key) for key, a, b in pending)
+        # no forest edge is found before the search, the checkpoints only let a cancelled job stop early
+        checkpoint(0, target)
+        index: Dict[int, int] = {}
+        src = [index.setdefault(a, len(index)) for a, _, _ in edges]
+        checkpoint(0, target)
+        dst = [index.setdefault(b, len(index)) for _, b, _ in edges]
+        checkpoint(0, target)
+        # weight and edge id in one int, ties are broken by edge id as in insert
+        scale = max(key[1] for _, _, key in edges) + 1
+        weights = [key[0] * scale + key[1] for _, _, key in edges]
+        # tree is replaced only after the whole forest is found, a cancelled rebuild leaves it as it was
+        forest = minimum_spanning_forest(len(index), src, dst, weights, target)
+        self.tree = {edges[i][2][1]: edges[i] for i in forest}
+        self.trees = None
+
+    def build_trees(self):
+        """
+        every node starts as its own preferred path with the tree parent as path parent, O(n)
+        """
+        self.trees = LinkCutTrees()
+        self.vertex_node = {}
+        self.edge_node = {}
+        adj: defaultdict[int, List[int]] = defaultdict(list)
+        for e, (a, b, _) in self.tree.items():
+            adj[a].append(e)
+            adj[b].append(e)
+        for root in adj:
+            if root in self.vertex_node:
+                continue
+            self.vertex_node[root] = self.trees.new_node()
+            q = deque([root])
+            while q:
+                v = q.popleft()
+                for e in adj[v]:
+                    if e in self.edge_node:
+                        continue
+                    a, b, key = self.tree[e]
+                    u = b if a == v else a
+                    self.edge_node[e] = self.trees.new_node(key, self.vertex_node[v])
+                    self.vertex_node[u] = self.trees.new_node(NO_EDGE, self.edge_node[e])
+                    q.append(u)
+
+    def node(self, a: int) -> int:
+        if a not in self.vertex_node:
+            self.vertex_node[a] = self.trees.new_node()
+        return self.vertex_node[a]
+
+    def insert(self, key: EdgeKey, a: int, b: int):
+        if self.trees is None:
+            self.build_trees()
+        trees = self.trees
+        x, y = self.node(a), self.node(b)
+        if trees.find_root(x) == trees.find_root(y):
+            heaviest = trees.path_max(x, y)
+            if trees.key[heaviest] < key:
+                return
+            old = trees.key[heaviest][1]
+            old_a, old_b, _ = self.tree.pop(old)
+            trees.cut(self.vertex_node[old_a], heaviest)
+            trees.cut(heaviest, self.vertex_node[old_b])
+            del self.edge_node[old]
+        e = key[1]
+        self.edge_node[e] = trees.new_node(key)
+        trees.link(x, self.edge_node[e])
+        trees.link(self.edge_node[e], y)
+        self.tree[e] = (a, b, key)
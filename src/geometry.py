@@ -0,0 +1,68 @@
+import math
+from typing import List, Sequence, Tuple
+
+Point = Tuple[float, float]
+Arrow = Tuple[Point, Point, Point]  # tip and two wing ends, drawn as lines wing -> tip
+
+
+ARROW_DIST = 50  # from the end vertex center to the back of the arrowhead
+ARROW_WING = 10
+ARROW_LENGTH = 20
+LABEL_OFFSET = (5, 15)
+
+
+def arrow_points(x: float, y: float, ux: float, uy: float) -> Arrow:
+    """
+    arrowhead with its back at (x, y) pointing against unit vector (ux, uy)
+    """
+    return ((x - ARROW_LENGTH * ux, y - ARROW_LENGTH * uy),
+            (x + ARROW_WING * uy, y - ARROW_WING * ux),
+            (x - ARROW_WING * uy, y + ARROW_WING * ux))
+
+
+def edge_geometry(x1s: Sequence[int], y1s: Sequence[int], x2s: Sequence[int], y2s: Sequence[int]) \
+        -> Tuple[List[Point], List[Arrow]]:
+    """
+    weight label centers and arrowheads of many edges in one pass, without trigonometry,
+    everything is in world coordinates so only moving vertices makes it stale
+    :param x1s: x of edge ends (arrow side), the same index in all four sequences is one edge
+    :param x2s: x of edge starts
+    :return: label centers, arrows placed at fixed distance from the end towards the start
+    """
+    dist = ARROW_DIST
+    wing = ARROW_WING
+    length = ARROW_LENGTH
+    label_dx, label_dy = LABEL_OFFSET
+    hypot = math.hypot
+    labels = []
+    arrows = []
+    for x1, y1, x2, y2 in zip(x1s, y1s, x2s, y2s):
+        labels.append(((x1 + x2) // 2 - label_dx, (y1 + y2) // 2 - label_dy))
+        dx = x2 - x1
+        dy = y2 - y1
+        norm = hypot(dx, dy)
+        if norm == 0:
+            ux, uy = 1.0, 0.0
+        else:
+            ux, uy = dx / norm, dy / norm
+        # same as arrow_points, inlined because this runs for every edge after each layout step
+        x = x1 + dist * ux
+        y = y1 + dist * uy
+        arrows.append(((x - length * ux, y - length * uy),
+                       (x + wing * uy, y - wing * ux),
+                       (x - wing * uy, y + wing * ux)))
+    return labels, arrows
+
+
+LOOP_ARROW_COS = math.cos(math.radians(40))
+LOOP_ARROW_SIN = math.sin(math.radians(40))
+
+
+def loop_geometry(x: int, y: int, radius: int) -> Tuple[Point, Point, Arrow]:
+    """
+    :return: circle center, weight label center and arrowhead of a loop on vertex at (x, y)
+    """
+    center = (x + radius + 5, y - radius + 5)
+    label = (x + radius + 5, y - radius - 25)
+    arrow = arrow_points(x + radius + 10, y - 15, LOOP_ARROW_COS, -LOOP_ARROW_SIN)
+    return center, label, arrow
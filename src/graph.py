@@ -1,8 +1,21 @@
 import math
-import random
-from typing import Tuple, List
+import os
+from typing import Tuple, List, Iterable, Sequence, Set
 from collections import defaultdict
 from .constants import *
+from .camera import Camera
+from .fonts import render_text, text_cache
+from .spatial import SpatialGrid
+from .csr import CSRGraph
+from .engine import ComponentFound, Condensation
+from .forest import SpanningForest
+from .geometry import edge_geometry, loop_geometry
+from .lod import EdgeHeatmap, level_of_detail
+from .loader import load_edge_list, GraphFormatError
+from .layout import ForceLayout, Bounds, random_layout, circular_layout, grid_layout
+from .results import ResultCache
+from .snapshot import Snapshot, SnapshotError, CACHE_DIR, cache_path_for, is_snapshot, read_snapshot, write_snapshot, \
+    remove_stale_cache
 import pygame
 
 
@@ -13,30 +26,75 @@ class Vertex:
 
     def __init__(self, number: int, pos: Tuple[int, int]):
         self.number = number
-        self.rect = pygame.Rect(pos[0] - self.RADIUS * Graph.scale, pos[1] - self.RADIUS * Graph.scale,
-                                2*self.RADIUS * Graph.scale, 2*self.RADIUS * Graph.scale)
-        self.color = Colors.GREY
-        self.border_color = Colors.BLACK
-        font = pygame.font.Font('freesansbold.ttf', int(40 * Graph.scale))
-        self.text = font.render(str(self.number), True, Colors.BLACK)
-        self.is_clicked = False
-
-    def draw(self, win: pygame.Surface):
-        self.rect.update(self.rect[0], self.rect[1], 2*self.RADIUS * Graph.scale, 2*self.RADIUS * Graph.scale)
-        pygame.draw.circle(win, self.color, self.rect.center, self.RADIUS * Graph.scale)
+        self.rect = pygame.Rect(pos[0] - self.RADIUS, pos[1] - self.RADIUS, 2*self.RADIUS, 2*self.RADIUS)  # world
+        self.observer = None  # graph notified about visual changes, set by Graph.add_vertex
+        self._color = Colors.GREY
+        self._border_color = Colors.BLACK
+        self._is_clicked = False
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        return self._color
+
+    @color.setter
+    def color(self, color: Tuple[int, int, int]):
+        if color != self._color:
+            self._color = color
+            if self.observer:
+                self.observer.vertex_changed(self)
+
+    @property
+    def border_color(self) -> Tuple[int, int, int]:
+        return self._border_color
+
+    @border_color.setter
+    def border_color(self, color: Tuple[int, int, int]):
+        if color != self._border_color:
+            self._border_color = color
+            if self.observer:
+                self.observer.vertex_changed(self)
+
+    @property
+    def is_clicked(self) -> bool:
+        return self._is_clicked
+
+    @is_clicked.setter
+    def is_clicked(self, clicked: bool):
+        if clicked != self._is_clicked:
+            self._is_clicked = clicked
+            if self.observer:
+                self.observer.vertex_changed(self)
+
+    def draw(self, win: pygame.Surface, detail: int = Detail.FULL):
+        center = Graph.camera.to_screen(self.rect.center)
+        if detail == Detail.POINTS:
+            # default grey fill would vanish on the background, so plain vertices show their border color
+            color = self.border_color if self.color == Colors.GREY else self.color
+            pygame.draw.rect(win, Colors.GREEN if self.is_clicked else color, (center[0] - 1, center[1] - 1, 3, 3))
+            return
+        pygame.draw.circle(win, self.color, center, self.RADIUS * Graph.scale)
+        if detail == Detail.SIMPLE:
+            pygame.draw.circle(win, Colors.GREEN if self.is_clicked else self.border_color, center,
+                               self.RADIUS * Graph.scale, 1)
+            return
         if self.is_clicked:
-            pygame.draw.circle(win, Colors.GREEN, self.rect.center, self.RADIUS * Graph.scale,
+            pygame.draw.circle(win, Colors.GREEN, center, self.RADIUS * Graph.scale,
                                int(self.LINE_SIZE * Graph.scale))
         else:
-            pygame.draw.circle(win, self.border_color, self.rect.center, self.RADIUS * Graph.scale,
+            pygame.draw.circle(win, self.border_color, center, self.RADIUS * Graph.scale,
                                int(self.LINE_SIZE * Graph.scale))
-        font = pygame.font.Font('freesansbold.ttf', int(40 * Graph.scale))
-        self.text = font.render(str(self.number), True, Colors.BLACK)
-        win.blit(self.text, self.text.get_rect(center=self.rect.center))
+        text = render_text(str(self.number), int(40 * Graph.scale), Colors.BLACK)
+        win.blit(text, text.get_rect(center=center))
 
     def get_pos(self):
+        """
+        :return: center in world coordinates
+        """
         return self.rect.center
 
+    def bounds(self) -> pygame.Rect:
+        return self.rect.inflate(4, 4)
+
 
 class Edge:
 
@@ -44,251 +102,640 @@ class Edge:
 
     def __init__(self, a: Vertex = None, b: Vertex = None, weight: int = 1):
         self.weight = weight
-        self.color = Colors.BLACK
+        self.observer = None  # set by Graph.register_edge together with edge_id
+        self.edge_id = -1
+        self._color = Colors.BLACK
         self.directing = False
         self.weighted = False
         self.start = a
         self.end = b
-        font = pygame.font.Font('freesansbold.ttf', int(25 * Graph.scale))
-        self.text = font.render(str(self.weight), True, Colors.BLACK)
+        self.label = None  # weight label center and arrowhead, None until computed for current positions
+        self.arrow = None
 
-    def draw(self, win: pygame.Surface):
-        if self.start and self.end:
-            p1 = self.end.get_pos()
-            p2 = self.start.get_pos()
-            pygame.draw.line(win, self.color, p1, p2, int(self.SIZE * Graph.scale))
-            if self.weighted:
-                center = ((p1[0] + p2[0]) // 2 - int(5 * Graph.scale), (p1[1] + p2[1]) // 2 - int(15 * Graph.scale))
-                font = pygame.font.Font('freesansbold.ttf', int(25 * Graph.scale))
-                self.text = font.render(str(self.weight), True, Colors.BLACK)
-                win.blit(self.text, self.text.get_rect(center=center))
-            if self.directing:
-                dist = int(50 * Graph.scale)
-
-                dx = p2[0] - p1[0]
-                dy = p2[1] - p1[1]
-                rads = math.atan2(-dy, dx)
-                rads %= 2 * math.pi
-                degs = math.degrees(rads)
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        return self._color
 
-                new_x = p1[0] + (dist * math.cos(-rads))
-                new_y = p1[1] + (dist * math.sin(-rads))
+    @color.setter
+    def color(self, color: Tuple[int, int, int]):
+        if color != self._color:
+            self._color = color
+            if self.observer:
+                self.observer.edge_changed(self)
 
-                self.draw_arrow(win, new_x, new_y, self.color, degs)
+    def bounds(self) -> pygame.Rect:
+        """
+        :return: world rect covering line, arrow and weight label
+        """
+        p1 = self.start.get_pos()
+        p2 = self.end.get_pos()
+        pad = 60 + self.SIZE
+        return pygame.Rect(min(p1[0], p2[0]) - pad, min(p1[1], p2[1]) - pad,
+                           abs(p1[0] - p2[0]) + 2 * pad, abs(p1[1] - p2[1]) + 2 * pad)
 
-    def draw_arrow(self, win, x, y, color, angle=0.0):
-        def rotate(pos, theta):
-            cen = (0 + x, 0 + y)
-            theta *= -(math.pi / 180)
-            cos_theta = math.cos(theta)
-            sin_theta = math.sin(theta)
-            ret = ((cos_theta * (pos[0] - cen[0]) - sin_theta * (pos[1] - cen[1])) + cen[0],
-                   (sin_theta * (pos[0] - cen[0]) + cos_theta * (pos[1] - cen[1])) + cen[1])
-            return ret
+    def update_geometry(self):
+        """
+        recomputes cached label and arrow of this edge alone, Graph.refresh_edge_geometry does it in batches
+        """
+        (x1, y1), (x2, y2) = self.end.get_pos(), self.start.get_pos()
+        labels, arrows = edge_geometry((x1,), (y1,), (x2,), (y2,))
+        self.label, self.arrow = labels[0], arrows[0]
 
-        p0 = rotate((0 + x, int(-10*Graph.scale) + y), angle)
-        p1 = rotate((0 + x, int(10*Graph.scale) + y), angle)
-        p2 = rotate((int(-20 * Graph.scale) + x, 0 + y), angle)
+    def draw(self, win: pygame.Surface, detail: int = Detail.FULL):
+        if self.start and self.end:
+            to_screen = Graph.camera.to_screen
+            if detail != Detail.FULL:
+                pygame.draw.line(win, self.color, to_screen(self.end.get_pos()), to_screen(self.start.get_pos()))
+                return
+            if self.arrow is None:
+                self.update_geometry()
+            width = int(self.SIZE * Graph.scale)
+            pygame.draw.line(win, self.color, to_screen(self.end.get_pos()), to_screen(self.start.get_pos()), width)
+            if self.weighted:
+                text = render_text(str(self.weight), int(25 * Graph.scale), Colors.BLACK)
+                win.blit(text, text.get_rect(center=to_screen(self.label)))
+            if self.directing:
+                self.draw_arrow(win, self.color, width)
 
-        pygame.draw.line(win, color, p0, p2, int(self.SIZE * Graph.scale))
-        pygame.draw.line(win, color, p1, p2, int(self.SIZE * Graph.scale))
+    def draw_arrow(self, win: pygame.Surface, color: Tuple[int, int, int], width: int):
+        tip, wing_a, wing_b = map(Graph.camera.to_screen, self.arrow)
+        pygame.draw.line(win, color, wing_a, tip, width)
+        pygame.draw.line(win, color, wing_b, tip, width)
 
 
 class Loop(Edge):
 
     def __init__(self, a: Vertex, weight: int = 1):
         super().__init__(a, a, weight)
+        self.center = None
 
-    def draw(self, win: pygame.Surface):
+    def bounds(self) -> pygame.Rect:
+        p = self.start.get_pos()
+        size = Vertex.RADIUS + 60
+        return pygame.Rect(p[0] - size, p[1] - size, 2 * size, 2 * size)
+
+    def update_geometry(self):
         p = self.start.get_pos()
-        pygame.draw.circle(win, self.color, (p[0] + int((Vertex.RADIUS + 5) * Graph.scale),
-                                             p[1] - int((Vertex.RADIUS - 5) * Graph.scale)), int(20 * Graph.scale),
-                           int(self.SIZE * Graph.scale))
+        self.center, self.label, self.arrow = loop_geometry(p[0], p[1], Vertex.RADIUS)
+
+    def draw(self, win: pygame.Surface, detail: int = Detail.FULL):
+        if detail != Detail.FULL:
+            # cached geometry is refreshed only for full detail
+            p = self.start.get_pos()
+            center = loop_geometry(p[0], p[1], Vertex.RADIUS)[0]
+            pygame.draw.circle(win, self.color, Graph.camera.to_screen(center), int(20 * Graph.scale), 1)
+            return
+        if self.arrow is None:
+            self.update_geometry()
+        width = int(self.SIZE * Graph.scale)
+        pygame.draw.circle(win, self.color, Graph.camera.to_screen(self.center), int(20 * Graph.scale), width)
         if self.weighted:
-            center = (p[0] + int((Vertex.RADIUS + 5) * Graph.scale), p[1] - int((Vertex.RADIUS + 25) * Graph.scale))
-            win.blit(self.text, self.text.get_rect(center=center))
+            text = render_text(str(self.weight), int(25 * Graph.scale), Colors.BLACK)
+            win.blit(text, text.get_rect(center=Graph.camera.to_screen(self.label)))
         if self.directing:
-            self.draw_arrow(win, p[0] + int((Vertex.RADIUS + 10) * Graph.scale), p[1] - int(15 * Graph.scale),
-                            self.color, 40)
+            self.draw_arrow(win, self.color, width)
 
 
 class Graph:
 
-    scale = 1
+    scale = 1  # camera zoom, kept equal to camera.zoom by Graph.zoom and Graph.fit_view
+    camera = Camera()
+    VIEWPORT = pygame.Rect(0, HEIGHT // 5, WIDTH, HEIGHT - HEIGHT // 5)  # screen area below the buttons
+    LAYOUTS = ("force", "circular", "grid")
+    EDGE_GRID_CELL = 128
+    SPACING = 3 * Vertex.RADIUS  # world space per vertex in layouts of big graphs
 
     def __init__(self):
-        self.adj_list_undirected = defaultdict(list)
-        self.adj_list_directed = defaultdict(list)
-        self.current_adj_list = self.adj_list_undirected
         self.vertex_dict: defaultdict[int, Vertex] = defaultdict()
         self.edge_arr: List[Edge] = []
+        self.csr = None
+        self.version = 0  # bumped by every change of vertices, edges or graph flags
+        self.layout_version = 0  # bumped whenever vertices move
+        self.results = ResultCache()
+        self.forest = SpanningForest()  # components and minimum spanning forest, updated per added edge
 
         self.adding_edge = False
         self.adding_edge_first_v = None
         self.directing = False
         self.weighted = False
 
+        self.vertex_grid = SpatialGrid(2 * Vertex.RADIUS)
+        self.hovered_vertices: List[Vertex] = []
+        self.dragged_vertices: List[Vertex] = []
+        self.layout = None
+        self.layout_name = self.LAYOUTS[0]
+        self.cache_path = None
+
+        self.incident_edges: defaultdict[int, List[Edge]] = defaultdict(list)
+        self.edge_grid = SpatialGrid(self.EDGE_GRID_CELL)
+        self.edge_grid_valid = True
+        self.dirty_rects: List[pygame.Rect] = []
+        self.redraw_all = True
+        self.geometry_valid = True  # False when every edge needs new label and arrow positions
+        self.stale_geometry: Set[int] = set()  # ids of edges whose vertices moved
+        self.detail = Detail.FULL
+        self.heatmap = EdgeHeatmap()
+        self.heatmap_valid = False
+        self.highlighted_edges: Set[int] = set()  # ids of edges with other than default color
+        self.density_key = None
+        self.density = 0.0
+
+    @staticmethod
+    def zoom(factor: float, pos: Tuple[int, int] = None):
+        """
+        zooms camera keeping screen point pos (viewport center by default) in place,
+        drops labels rendered for the old scale
+        """
+        Graph.camera.zoom_at(pos or Graph.VIEWPORT.center, factor)
+        Graph.scale = Graph.camera.zoom
+        text_cache.clear()
+
+    def fit_view(self, bounds: Bounds = None):
+        """
+        moves camera to show whole graph, or given world bounds, below the buttons
+        """
+        if bounds is None:
+            if not self.vertex_dict:
+                return
+            rects = [v.rect for v in self.vertex_dict.values()]
+            area = rects[0].unionall(rects[1:])
+            bounds = area.left, area.top, area.right, area.bottom
+        Graph.camera.fit(bounds, Graph.VIEWPORT)
+        Graph.scale = Graph.camera.zoom
+        text_cache.clear()
+
     def draw(self, win: pygame.Surface):
+        """
+        draws what is visible on the window, cost depends on what is on screen, not on graph size
+        """
+        self.draw_region(win, win.get_rect())
+        self.draw_adding_edge(win)
+
+    def draw_edges(self, win: pygame.Surface, edges: Iterable[Edge], rect: pygame.Rect):
+        for e in edges:
+            e.draw(win, self.detail)
+
+    def heatmap_mode(self) -> bool:
+        return self.detail == Detail.POINTS and len(self.edge_arr) > Detail.HEATMAP_EDGES
+
+    def update_detail(self):
+        """
+        picks level of detail from scale and vertex density, everything is repainted when it changes
+        """
+        camera = Graph.camera
+        key = (camera.zoom, len(self.vertex_dict),
+               int(camera.x * camera.zoom * 4 // WIDTH), int(camera.y * camera.zoom * 4 // HEIGHT))
+        if key != self.density_key:
+            # counted again after zoom, quarter screen pan or vertex count change
+            self.density_key = key
+            view = camera.rect_to_world(Graph.VIEWPORT)
+            visible = sum(1 for num in self.vertex_grid.query_rect(view)
+                          if view.collidepoint(self.vertex_dict[num].get_pos()))
+            self.density = visible * 10_000 / (Graph.VIEWPORT.w * Graph.VIEWPORT.h)
+        detail = level_of_detail(Graph.scale, self.density)
+        if detail != self.detail:
+            self.detail = detail
+            self.redraw_all = True
+
+    def draw_adding_edge(self, win: pygame.Surface) -> List[pygame.Rect]:
+        """
+        draws edge being added that follows the mouse
+        :return: painted area
+        """
+        if not self.adding_edge:
+            return []
+        pos = pygame.mouse.get_pos()
+        if self.adding_edge_first_v:
+            rect = pygame.draw.line(win, Colors.BLACK, pos, Graph.camera.to_screen(self.adding_edge_first_v.get_pos()),
+                                    int(Edge.SIZE * Graph.scale))
+        else:
+            rect = pygame.draw.line(win, Colors.BLACK, pos, (pos[0]+10, pos[1]+5), int(Edge.SIZE * Graph.scale))
+        return [rect]
+
+    def draw_region(self, win: pygame.Surface, rect: pygame.Rect):
+        """
+        draws only edges and vertices whose bounds intersect screen rect
+        """
+        self.prepare_draw()
+        # few pixels of margin for points and thin lines that are bigger than their bounds when zoomed out
+        world = Graph.camera.rect_to_world(rect.inflate(4, 4))
+        if self.heatmap_mode():
+            self.heatmap.draw(win, rect, Graph.camera)
+            # edges highlighted by algorithms are still drawn over the heatmap
+            edges = [e for e in sorted(self.highlighted_edges) if world.colliderect(self.edge_arr[e].bounds())]
+        else:
+            edges = sorted(self.edge_grid.query_rect(world))
+        self.draw_edges(win, [self.edge_arr[e] for e in edges], rect)
+        for num in sorted(self.vertex_grid.query_rect(world)):
+            self.vertex_dict[num].draw(win, self.detail)
+
+    def prepare_draw(self):
+        """
+        brings edge grid, cached edge geometry and heatmap up to date with vertex positions and camera
+        """
+        if not self.edge_grid_valid:
+            self.rebuild_edge_grid()
+        if self.detail == Detail.FULL:
+            self.refresh_edge_geometry()
+        elif self.heatmap_mode() and (not self.heatmap_valid or not self.heatmap.covers(Graph.camera)):
+            edges = map(self.edge_arr.__getitem__, self.edge_grid.query_rect(self.heatmap.area(Graph.camera)))
+            self.heatmap.build(((e.start.get_pos(), e.end.get_pos()) for e in edges), Graph.camera)
+            self.heatmap_valid = True
+
+    def refresh_edge_geometry(self):
+        """
+        recomputes labels and arrowheads of edges whose vertices moved, all in one batch
+        """
+        if not self.geometry_valid:
+            edges = self.edge_arr
+        elif self.stale_geometry:
+            edges = [self.edge_arr[e] for e in self.stale_geometry]
+        else:
+            return
+        self.geometry_valid = True
+        self.stale_geometry = set()
+
+        lines = [e for e in edges if not isinstance(e, Loop)]
+        ends = [e.end.rect.center for e in lines]
+        starts = [e.start.rect.center for e in lines]
+        labels, arrows = edge_geometry([p[0] for p in ends], [p[1] for p in ends],
+                                       [p[0] for p in starts], [p[1] for p in starts])
+        for e, label, arrow in zip(lines, labels, arrows):
+            e.label = label
+            e.arrow = arrow
+        if len(lines) < len(edges):
+            for e in edges:
+                if isinstance(e, Loop):
+                    e.update_geometry()
+
+    def rebuild_edge_grid(self):
+        self.edge_grid = SpatialGrid(self.EDGE_GRID_CELL)
         for e in self.edge_arr:
-            e.draw(win)
-        if self.adding_edge:
-            pos = pygame.mouse.get_pos()
-            if self.adding_edge_first_v:
-                pygame.draw.line(win, Colors.BLACK, pos, self.adding_edge_first_v.get_pos(),
-                                 int(Edge.SIZE * Graph.scale))
-            else:
-                pygame.draw.line(win, Colors.BLACK, pos, (pos[0]+10, pos[1]+5), int(Edge.SIZE * Graph.scale))
-        for v in self.vertex_dict.values():
-            v.draw(win)
+            self.edge_grid.insert(e.edge_id, e.bounds())
+        self.edge_grid_valid = True
+
+    def vertex_changed(self, v: Vertex):
+        if not self.redraw_all:
+            self.dirty_rects.append(v.bounds())
+
+    def edge_changed(self, e: Edge):
+        if e.color == Colors.BLACK:
+            self.highlighted_edges.discard(e.edge_id)
+        else:
+            self.highlighted_edges.add(e.edge_id)
+        if not self.redraw_all:
+            self.dirty_rects.append(e.bounds())
+
+    def color_edges(self, edge_ids: Sequence[int], color: Tuple[int, int, int]):
+        """
+        colors many edges at once, one full redraw instead of a dirty rect for every edge
+        """
+        for e in edge_ids:
+            self.edge_arr[e]._color = color
+        if color == Colors.BLACK:
+            self.highlighted_edges.difference_update(edge_ids)
+        else:
+            self.highlighted_edges.update(edge_ids)
+        self.redraw_all = True
+
+    def move_vertex(self, v: Vertex, pos: Tuple[int, int]):
+        """
+        moves single vertex, marking old and new area of it and its edges dirty
+        """
+        if v.rect.center == pos:
+            return
+        edges = self.incident_edges[v.number]
+        if not self.redraw_all:
+            self.dirty_rects.append(v.bounds())
+            self.dirty_rects.extend(e.bounds() for e in edges)
+        v.rect.center = pos
+        self.layout_version += 1
+        self.vertex_grid.move(v.number, v.bounds())
+        if not self.redraw_all:
+            self.dirty_rects.append(v.bounds())
+            self.dirty_rects.extend(e.bounds() for e in edges)
+        if self.edge_grid_valid:
+            for e in edges:
+                self.edge_grid.move(e.edge_id, e.bounds())
+        self.stale_geometry.update(e.edge_id for e in edges)
+        self.heatmap_valid = False
+
+    def take_dirty_rects(self) -> List[pygame.Rect]:
+        """
+        :return: screen rects changed since the last call
+        """
+        rects = [Graph.camera.rect_to_screen(rect).inflate(4, 4) for rect in self.dirty_rects]
+        self.dirty_rects = []
+        return rects
 
     def update(self):
         """
         updates nodes position if they are moved by mouse
         """
-        for v in self.vertex_dict.values():
-            if v.is_clicked:
-                v.rect.center = pygame.mouse.get_pos()
+        self.update_detail()
+        for v in self.dragged_vertices:
+            self.move_vertex(v, Graph.camera.to_world(pygame.mouse.get_pos()))
+        if self.layout:
+            if self.layout.advance(LAYOUT_BUDGET_MS):
+                self.move_vertices(self.layout.xs, self.layout.ys)
+                index = self.get_csr().index
+                for v in self.dragged_vertices:
+                    self.layout.xs[index[v.number]], self.layout.ys[index[v.number]] = v.get_pos()
+            if self.layout.done:
+                self.layout = None
+                self.save_to_cache()
+
+    def layout_bounds(self, n: int = None) -> Bounds:
+        """
+        world area for layouts, the viewport at zoom 1, grown so big graphs get SPACING^2 per vertex
+        :param n: number of vertices, by default current one
+        """
+        view = Graph.VIEWPORT
+        if n is None:
+            n = len(self.vertex_dict)
+        grow = max(1.0, math.sqrt(n * self.SPACING ** 2 / (view.w * view.h)))
+        r = Vertex.RADIUS
+        return view.left + r, view.top + r, view.left + view.w * grow - r, view.top + view.h * grow - r
+
+    def apply_layout(self, name: str):
+        """
+        places all vertices, force layout keeps running in update() until it settles
+        """
+        self.layout_name = name
+        self.layout = None
+        n = len(self.vertex_dict)
+        self.fit_view(self.layout_bounds())
+        if name == "force":
+            csr = self.get_csr()
+            positions = [v.get_pos() for v in self.vertex_dict.values()]
+            self.layout = ForceLayout([p[0] for p in positions], [p[1] for p in positions], csr.src, csr.dst,
+                                      self.layout_bounds())
+        elif name == "circular":
+            self.move_vertices(*circular_layout(n, self.layout_bounds()))
+        elif name == "grid":
+            self.move_vertices(*grid_layout(n, self.layout_bounds()))
+
+    def next_layout(self):
+        self.apply_layout(self.LAYOUTS[(self.LAYOUTS.index(self.layout_name) + 1) % len(self.LAYOUTS)])
+
+    def move_vertices(self, xs: Sequence[float], ys: Sequence[float]):
+        """
+        moves vertices to positions given in vertex_dict order, dragged ones stay under the mouse
+        """
+        for v, x, y in zip(self.vertex_dict.values(), xs, ys):
+            if not v.is_clicked:
+                v.rect.center = (x, y)
+                self.vertex_grid.move(v.number, v.bounds())
+        self.layout_version += 1
+        self.edge_grid_valid = False
+        self.geometry_valid = False
+        self.heatmap_valid = False
+        self.redraw_all = True
+
+    def vertices_at(self, pos: Tuple[int, int]) -> List[Vertex]:
+        """
+        :param pos: screen position
+        :return: vertices under given point, found through the spatial grid
+        """
+        pos = Graph.camera.to_world(pos)
+        found = []
+        for num in self.vertex_grid.query_point(pos):
+            v = self.vertex_dict[num]
+            if v.rect.collidepoint(pos):
+                found.append(v)
+        return found
 
     def hover_nodes_on_mouse(self, mouse_pos: Tuple[int, int]):
-        for v in self.vertex_dict.values():
-            if v.rect.collidepoint(mouse_pos) and (v.color == Colors.GREY or v.color == Colors.DARK_GREY):
-                v.color = Colors.DARK_GREY
-            elif v.color == Colors.DARK_GREY:
+        for v in self.hovered_vertices:
+            if v.color == Colors.DARK_GREY:
                 v.color = Colors.GREY
+        self.hovered_vertices = []
+        for v in self.vertices_at(mouse_pos):
+            if v.color == Colors.GREY or v.color == Colors.DARK_GREY:
+                v.color = Colors.DARK_GREY
+                self.hovered_vertices.append(v)
 
     def get_clicked_node_number(self, event: pygame.event, mouse_pos: Tuple[int, int],
                                 mouse_color: Tuple[int, int, int]) -> int:
         if event.type == pygame.MOUSEBUTTONDOWN:
-            for v in self.vertex_dict.values():
-                if v.rect.collidepoint(mouse_pos):
-                    v.color = mouse_color
-                    return v.number
+            for v in self.vertices_at(mouse_pos):
+                v.color = mouse_color
+                self.hovered_vertices = []
+                return v.number
 
     def change_directing(self, d: bool):
         """
-        update edges and current adjacency list
+        update edges
         """
-        if self.current_adj_list is self.adj_list_directed:
-            self.current_adj_list = self.adj_list_undirected
-        else:
-            self.current_adj_list = self.adj_list_directed
         for e in self.edge_arr:
             e.directing = d
         self.directing = d
+        self.version += 1
+        self.cache_path = None  # cached snapshot keeps flags of the text file, not user toggles
+        self.redraw_all = True
 
     def change_weighted(self, w: bool):
         for e in self.edge_arr:
             e.weighted = w
         self.weighted = w
+        self.version += 1
+        self.cache_path = None
+        self.redraw_all = True
 
     def check_clicked_vertex(self, mouse_pos: Tuple[int, int]):
-        for v in self.vertex_dict.values():
-            if v.rect.collidepoint(mouse_pos):
-                v.is_clicked = not v.is_clicked
+        for v in self.vertices_at(mouse_pos):
+            v.is_clicked = not v.is_clicked
+            if v.is_clicked:
+                self.dragged_vertices.append(v)
+            else:
+                self.dragged_vertices.remove(v)
 
     def check_clicked_vertex_while_adding_edge(self, mouse_pos: Tuple[int, int]) -> bool:
-        for v in self.vertex_dict.values():
-            if v.rect.collidepoint(mouse_pos):
-                if not self.adding_edge_first_v:
-                    self.adding_edge_first_v = v
-                    return False
+        for v in self.vertices_at(mouse_pos):
+            if not self.adding_edge_first_v:
+                self.adding_edge_first_v = v
+                return False
+            else:
+                if self.adding_edge_first_v.number == v.number:
+                    self.add_loop(v, 1)
                 else:
-                    a, b = self.adding_edge_first_v.number, v.number
-                    self.adj_list_undirected[a].append(b)
-                    self.adj_list_undirected[b].append(a)
-                    self.adj_list_directed[a].append(b)
-                    if b not in self.adj_list_directed.keys():
-                        self.adj_list_directed[b] = []
-                    if b not in self.adj_list_undirected.keys():
-                        self.adj_list_undirected[b] = []
-
-                    if self.adding_edge_first_v.number == v.number:
-                        self.edge_arr.append(Loop(v))
-                    else:
-                        self.add_edge(self.adding_edge_first_v, v, 1)
-                    if self.directing:
-                        self.edge_arr[len(self.edge_arr) - 1].directing = True
-                    if self.weighted:
-                        self.edge_arr[len(self.edge_arr) - 1].weighted = True
-                    self.adding_edge_first_v = None
-                    return True
+                    self.add_edge(self.adding_edge_first_v, v, 1)
+                if self.directing:
+                    self.edge_arr[len(self.edge_arr) - 1].directing = True
+                if self.weighted:
+                    self.edge_arr[len(self.edge_arr) - 1].weighted = True
+                self.adding_edge_first_v = None
+                return True
         return False
 
     def add_vertex(self, num: int, pos: Tuple[int, int]):
+        """
+        :param pos: world position
+        """
+        if num in self.vertex_dict:
+            self.vertex_grid.remove(num)
         self.vertex_dict[num] = Vertex(num, pos)
+        self.vertex_dict[num].observer = self
+        self.vertex_grid.insert(num, self.vertex_dict[num].bounds())
+        self.forest.add_vertex(num)
+        self.csr = None
+        self.version += 1
+        self.redraw_all = True
+        self.layout = None
+        self.cache_path = None
 
     def add_edge(self, a: Vertex, b: Vertex, w: int):
-        self.edge_arr.append(Edge(a, b, w))
+        self.register_edge(Edge(a, b, w))
 
-    def find_edge(self, a: int, b: int) -> Edge:
-        for e in self.edge_arr:
-            if e.start.number == a and e.end.number == b:
-                return e
-            if e.start.number == b and e.end.number == a:
-                return e
+    def add_loop(self, a: Vertex, w: int):
+        self.register_edge(Loop(a, w))
+
+    def register_edge(self, e: Edge):
+        """
+        appends edge to edge_arr and to the incidence lists
+        """
+        e.edge_id = len(self.edge_arr)
+        e.observer = self
+        self.edge_arr.append(e)
+        self.incident_edges[e.start.number].append(e)
+        if e.end is not e.start:
+            self.incident_edges[e.end.number].append(e)
+        self.forest.add_edge(e.edge_id, e.start.number, e.end.number, int(e.weight))
+        self.stale_geometry.add(e.edge_id)
+        self.heatmap_valid = False
+        self.edge_grid_valid = False
+        self.csr = None
+        self.version += 1
+        self.redraw_all = True
+        self.cache_path = None
+
+    def get_csr(self) -> CSRGraph:
+        """
+        :return: CSR form of the graph, rebuilt only after vertices or edges were added
+        """
+        if self.csr is None:
+            self.csr = CSRGraph(self.vertex_dict.keys(),
+                                ((e.start.number, e.end.number, e.weight) for e in self.edge_arr))
+        return self.csr
+
+    def connected(self, a: int, b: int) -> bool:
+        """
+        :return: True if a and b are in one component when edge directions are ignored
+        """
+        return self.forest.connected(a, b)
 
     def load_graph_from_file(self, file_path: str):
+        """
+        loads text edge list or binary snapshot, parsed text files are cached as snapshots
+        keyed by path, mtime and size once their force layout settles, so reopening them is instant
+        and keeps the layout
+        """
+        if is_snapshot(file_path):
+            try:
+                self.load_snapshot(file_path)
+            except (OSError, SnapshotError) as e:
+                print(e)
+                print("Invalid file format")
+            return
         self.__init__()
-        weights = defaultdict()
         try:
-            with open(file_path, 'r') as file:
-                try:
-                    n, m = file.readline().split()
-                    for i in range(int(n)):
-                        self.adj_list_undirected[i+1] = []
-                        self.adj_list_directed[i+1] = []
-                    for i in range(int(m)):
-                        values = file.readline().split()
-                        if len(values) == 3:
-                            a, b, c = values
-                            weights[f'{a}-{b}'] = c
-                        else:
-                            a, b = values
-                            weights[f'{a}-{b}'] = 1
-                        a, b = int(a), int(b)
-
-                        self.adj_list_undirected[a].append(b)
-                        self.adj_list_undirected[b].append(a)
-
-                        self.adj_list_directed[a].append(b)
-
-                except ValueError as e:
-                    print(e)
-                    print("Invalid file format")
-                    return
-        except FileNotFoundError:
+            cache_path = cache_path_for(file_path)
+        except (OSError, TypeError):
             print("No file selected")
             return
-        except TypeError:
+        if os.path.exists(cache_path):
+            try:
+                self.load_snapshot(cache_path)
+                return
+            except (OSError, SnapshotError):
+                self.__init__()
+
+        try:
+            edges = load_edge_list(file_path)
+        except GraphFormatError as e:
+            print(e)
+            print("Invalid file format")
+            return
+        except FileNotFoundError:
             print("No file selected")
             return
-        self.make_vertex_arr_from_adj_list()
-        self.make_edge_arr_from_adj_list(weights)
-
-    def make_vertex_arr_from_adj_list(self):
-        for v in self.adj_list_directed.keys():
-            loop = True
-            attempts = 0
-            x, y = 0, 0
-            while loop and attempts < 100:
-                loop = False
-                x = random.randint(int(Vertex.RADIUS * Graph.scale), WIDTH - int(Vertex.RADIUS * Graph.scale))
-                y = random.randint(HEIGHT // 5 + int(Vertex.RADIUS * Graph.scale),
-                                   HEIGHT - int(Vertex.RADIUS * Graph.scale))
-                test_rect = pygame.Rect(x - int(Vertex.RADIUS * Graph.scale), y - int(Vertex.RADIUS * Graph.scale),
-                                        2*int(Vertex.RADIUS * Graph.scale), 2*int(Vertex.RADIUS * Graph.scale))
-                for vertex in self.vertex_dict.values():
-                    if test_rect.colliderect(vertex.rect):
-                        loop = True
-                        attempts += 1
+        self.make_vertex_arr(range(1, edges.n + 1))
+        self.make_edge_arr_from_edge_list(edges.src, edges.dst, edges.weights)
+        self.apply_layout("force")
+
+        self.cache_path = cache_path
+        self.version += 1
+
+    def save_to_cache(self):
+        """
+        stores graph loaded from text file in snapshot cache, called once its force layout settles
+        """
+        if self.cache_path is None:
+            return
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            self.save_snapshot(self.cache_path)
+            remove_stale_cache(self.cache_path)
+        except OSError:
+            pass
+
+    def snapshot(self) -> Snapshot:
+        snapshot = Snapshot(self.directing, self.weighted)
+        for v in self.vertex_dict.values():
+            snapshot.ids.append(v.number)
+            snapshot.xs.append(v.get_pos()[0])
+            snapshot.ys.append(v.get_pos()[1])
+        for e in self.edge_arr:
+            snapshot.src.append(e.start.number)
+            snapshot.dst.append(e.end.number)
+            snapshot.weights.append(int(e.weight))
+        return snapshot
 
+    def save_snapshot(self, file_path: str):
+        write_snapshot(file_path, self.snapshot())
+
+    def load_snapshot(self, file_path: str):
+        snapshot = read_snapshot(file_path)
+        self.__init__()
+        for v, x, y in zip(snapshot.ids, snapshot.xs, snapshot.ys):
             self.add_vertex(v, (x, y))
+        self.make_edge_arr_from_edge_list(snapshot.src, snapshot.dst, snapshot.weights)
+        self.change_directing(snapshot.directed)
+        self.change_weighted(snapshot.weighted)
+        self.fit_view()
 
-    def make_edge_arr_from_adj_list(self, weights: defaultdict):
-        for v1, v_list in self.adj_list_directed.items():
-            for v2 in v_list:
-                if v1 == v2:
-                    self.edge_arr.append(Loop(self.vertex_dict[v1], weights[f'{v1}-{v2}']))
-                else:
-                    self.add_edge(self.vertex_dict[v1], self.vertex_dict[v2], weights[f'{v1}-{v2}'])
+    def condensation(self, components: List[ComponentFound], parts: Condensation) -> 'Graph':
+        """
+        directed acyclic graph of strongly connected components, every component becomes one vertex
+        colored like in SCC view if it has more than one, only creates vertices and edges,
+        the rest is computed by engine.condense off the main loop
+        :param components: scc_steps of this graph
+        :param parts: condense of components
+        :return: new graph, vertex numbers are component indices in topological order
+        """
+        condensed = Graph()
+        for step, center in zip(components, parts.centers):
+            condensed.add_vertex(step.index, center)
+        condensed.make_edge_arr_from_edge_list(parts.src, parts.dst, parts.weights)
+        for index, color in parts.colors.items():
+            condensed.vertex_dict[index].color = color
+        condensed.change_directing(True)
+        condensed.change_weighted(self.weighted)
+        return condensed
+
+    def make_vertex_arr(self, ids: Sequence[int]):
+        """
+        gives vertices random start positions, force layout spreads them afterwards
+        :param ids: vertex numbers
+        """
+        n = len(ids)
+        xs, ys = random_layout(n, self.layout_bounds(n))
+        for v, x, y in zip(ids, xs, ys):
+            self.add_vertex(v, (x, y))
 
+    def make_edge_arr_from_edge_list(self, src: Sequence[int], dst: Sequence[int], weights: Sequence[int]):
+        for a, b, w in zip(src, dst, weights):
+            if a == b:
+                self.add_loop(self.vertex_dict[a], w)
+            else:
+                self.add_edge(self.vertex_dict[a], self.vertex_dict[b], w)
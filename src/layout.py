@@ -0,0 +1,149 @@
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Iterator, List, Sequence, Tuple
+
+Bounds = Tuple[float, float, float, float]  # left, top, right, bottom
+
+
+def random_layout(n: int, bounds: Bounds) -> Tuple[List[float], List[float]]:
+    left, top, right, bottom = bounds
+    return [random.uniform(left, right) for _ in range(n)], [random.uniform(top, bottom) for _ in range(n)]
+
+
+def circular_layout(n: int, bounds: Bounds) -> Tuple[List[float], List[float]]:
+    left, top, right, bottom = bounds
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    rx, ry = (right - left) / 2, (bottom - top) / 2
+    angles = [2 * math.pi * i / max(n, 1) for i in range(n)]
+    return [cx + rx * math.cos(a) for a in angles], [cy + ry * math.sin(a) for a in angles]
+
+
+def grid_layout(n: int, bounds: Bounds) -> Tuple[List[float], List[float]]:
+    left, top, right, bottom = bounds
+    width, height = right - left, bottom - top
+    cols = max(1, math.ceil(math.sqrt(n * width / max(height, 1))))
+    rows = max(1, math.ceil(n / cols))
+    step_x = width / max(cols - 1, 1)
+    step_y = height / max(rows - 1, 1)
+    return [left + (i % cols) * step_x for i in range(n)], [top + (i // cols) * step_y for i in range(n)]
+
+
+class ForceLayout:
+    """
+    Fruchterman-Reingold layout with grid based repulsion, only vertices closer than ideal
+    edge length k repel each other, so one iteration is O(V + E) for evenly spread graphs,
+    iterations are split into chunks so advance() can run inside a frame budget
+    """
+
+    CHUNK = 1000
+    COOLING = 0.95
+    MIN_TEMPERATURE = 0.5
+
+    def __init__(self, xs: Sequence[float], ys: Sequence[float], src: Sequence[int], dst: Sequence[int],
+                 bounds: Bounds, max_k: float = 120, iterations: int = 300):
+        self.xs = list(xs)
+        self.ys = list(ys)
+        self.src = src
+        self.dst = dst
+        self.bounds = bounds
+        left, top, right, bottom = bounds
+        self.k = min(math.sqrt((right - left) * (bottom - top) / max(len(self.xs), 1)), max_k)
+        self.temperature = min(right - left, 10 * self.k) / 10
+        self.iterations_left = iterations
+        self.work = None
+        self.done = len(self.xs) == 0
+
+    def advance(self, budget_ms: float) -> bool:
+        """
+        runs layout work for about budget_ms, at most one iteration so the graph settles visibly
+        :return: True if an iteration finished and positions changed
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        while not self.done and time.perf_counter() < deadline:
+            if self.work is None:
+                self.work = self.iteration()
+            try:
+                next(self.work)
+            except StopIteration:
+                self.work = None
+                return True
+        return False
+
+    def run(self):
+        """
+        runs until layout settles, for use outside the ui
+        """
+        while not self.done:
+            self.advance(1000)
+
+    def iteration(self) -> Iterator[None]:
+        xs, ys = self.xs, self.ys
+        n = len(xs)
+        k = self.k
+        k2 = k * k
+        cell = k
+        cell2 = cell * cell
+        dx = [0.0] * n
+        dy = [0.0] * n
+
+        grid = defaultdict(list)
+        for i in range(n):
+            grid[(int(xs[i] // cell), int(ys[i] // cell))].append(i)
+        yield
+
+        done = 0
+        for (cx, cy), members in grid.items():
+            near = [j for ox in (-1, 0, 1) for oy in (-1, 0, 1) for j in grid.get((cx + ox, cy + oy), ())]
+            for i in members:
+                xi, yi = xs[i], ys[i]
+                fx = fy = 0.0
+                for j in near:
+                    if j == i:
+                        continue
+                    ddx = xi - xs[j]
+                    ddy = yi - ys[j]
+                    d2 = ddx * ddx + ddy * ddy
+                    if d2 < 0.01:
+                        ddx, ddy = random.uniform(-1, 1), random.uniform(-1, 1)
+                        d2 = ddx * ddx + ddy * ddy + 0.01
+                    if d2 < cell2:
+                        f = k2 / d2
+                        fx += ddx * f
+                        fy += ddy * f
+                dx[i] += fx
+                dy[i] += fy
+            done += len(members)
+            if done >= self.CHUNK:
+                done = 0
+                yield
+
+        src, dst = self.src, self.dst
+        for e in range(len(src)):
+            a, b = src[e], dst[e]
+            if a == b:
+                continue
+            ddx = xs[a] - xs[b]
+            ddy = ys[a] - ys[b]
+            f = math.sqrt(ddx * ddx + ddy * ddy) / k
+            dx[a] -= ddx * f
+            dy[a] -= ddy * f
+            dx[b] += ddx * f
+            dy[b] += ddy * f
+            if e % self.CHUNK == 0:
+                yield
+
+        left, top, right, bottom = self.bounds
+        t = self.temperature
+        for i in range(n):
+            disp = math.sqrt(dx[i] * dx[i] + dy[i] * dy[i])
+            if disp > 0:
+                s = min(disp, t) / disp
+                xs[i] = min(max(xs[i] + dx[i] * s, left), right)
+                ys[i] = min(max(ys[i] + dy[i] * s, top), bottom)
+
+        self.temperature *= self.COOLING
+        self.iterations_left -= 1
+        if self.iterations_left <= 0 or self.temperature < self.MIN_TEMPERATURE:
+            self.done = True
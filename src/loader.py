@@ -0,0 +1,108 @@
+from array import array
+from itertools import chain
+
+CHUNK_SIZE = 1 << 22
+
+
+class GraphFormatError(ValueError):
+
+    def __init__(self, line_no: int, message: str):
+        super().__init__(f"line {line_no}: {message}")
+        self.line_no = line_no
+
+
+class EdgeList:
+    """
+    parsed "n m" header and "a b [w]" edge lines, edges are kept in file order
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.src = array('q')
+        self.dst = array('q')
+        self.weights = array('q')
+        self.weighted = False
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+
+def load_edge_list(file_path: str, chunk_size: int = CHUNK_SIZE) -> EdgeList:
+    """
+    reads edge list file in chunks of lines straight into numeric arrays
+    :raises GraphFormatError: with number of the first bad line
+    """
+    with open(file_path, 'rb') as file:
+        header = file.readline().split()
+        if len(header) != 2:
+            raise GraphFormatError(1, "expected 'n m' header")
+        try:
+            n, m = int(header[0]), int(header[1])
+        except ValueError:
+            raise GraphFormatError(1, "expected 'n m' header")
+        if n < 0 or m < 0:
+            raise GraphFormatError(1, "negative vertex or edge count")
+
+        edges = EdgeList(n)
+        line_no = 1
+        while len(edges) < m:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                raise GraphFormatError(line_no + 1, f"expected {m} edges, found {len(edges)}")
+            lines = lines[:m - len(edges)]
+            parse_chunk(edges, lines, line_no)
+            line_no += len(lines)
+    return edges
+
+
+def parse_chunk(edges: EdgeList, lines: list, first_line_no: int):
+    """
+    converts whole chunk at once when every line has the same column count,
+    otherwise goes line by line to find what is wrong
+    """
+    split_lines = list(map(bytes.split, lines))
+    counts = set(map(len, split_lines))
+    if len(counts) == 1 and counts <= {2, 3}:
+        columns = counts.pop()
+        try:
+            values = array('q', map(int, chain.from_iterable(split_lines)))
+        except ValueError:
+            values = None
+        if values is not None:
+            src = values[0::columns]
+            dst = values[1::columns]
+            if check_range(edges.n, src, dst):
+                edges.src.extend(src)
+                edges.dst.extend(dst)
+                if columns == 3:
+                    edges.weights.extend(values[2::columns])
+                    edges.weighted = True
+                else:
+                    edges.weights.extend(array('q', [1]) * len(src))
+                return
+
+    for i, line in enumerate(lines):
+        parse_line(edges, line, first_line_no + 1 + i)
+
+
+def parse_line(edges: EdgeList, line: bytes, line_no: int):
+    values = line.split()
+    if len(values) not in (2, 3):
+        raise GraphFormatError(line_no, f"expected 'a b' or 'a b w', got {line.decode(errors='replace').strip()!r}")
+    try:
+        a, b = int(values[0]), int(values[1])
+        w = int(values[2]) if len(values) == 3 else 1
+    except ValueError:
+        raise GraphFormatError(line_no, f"not an integer in {line.decode(errors='replace').strip()!r}")
+    for v in (a, b):
+        if not 1 <= v <= edges.n:
+            raise GraphFormatError(line_no, f"vertex {v} out of range 1..{edges.n}")
+    if len(values) == 3:
+        edges.weighted = True
+    edges.src.append(a)
+    edges.dst.append(b)
+    edges.weights.append(w)
+
+
+def check_range(n: int, src: array, dst: array) -> bool:
+    return len(src) == 0 or (min(src) >= 1 and min(dst) >= 1 and max(src) <= n and max(dst) <= n)
@@ -0,0 +1,89 @@
+import math
+from collections import Counter
+from typing import Iterable, Tuple
+
+import pygame
+
+from src.camera import Camera
+from src.constants import Detail, WIDTH, HEIGHT
+
+
+def level_of_detail(scale: float, density: float) -> int:
+    """
+    :param density: vertices per 100x100 px of the graph area
+    :return: one of Detail.FULL, Detail.SIMPLE, Detail.POINTS
+    """
+    if scale < Detail.POINTS_SCALE or density > Detail.POINTS_DENSITY:
+        return Detail.POINTS
+    if scale < Detail.SIMPLE_SCALE or density > Detail.SIMPLE_DENSITY:
+        return Detail.SIMPLE
+    return Detail.FULL
+
+
+class EdgeHeatmap:
+    """
+    edges aggregated into grid of HEATMAP_CELL px cells, darker cell means more edges pass through it,
+    built as transparent surface over 3x3 screens around the view, so panning only shifts it
+    """
+
+    MAX_SAMPLES = 8
+
+    def __init__(self):
+        self.surface = None
+        self.origin = (0.0, 0.0)  # world point at surface top left
+        self.zoom = None
+
+    def area(self, camera: Camera) -> pygame.Rect:
+        """
+        :return: world rect the heatmap is built for when view is at camera
+        """
+        return pygame.Rect(int(camera.x - WIDTH / camera.zoom), int(camera.y - HEIGHT / camera.zoom),
+                           int(3 * WIDTH / camera.zoom) + 1, int(3 * HEIGHT / camera.zoom) + 1)
+
+    def offset(self, camera: Camera) -> Tuple[int, int]:
+        """
+        :return: surface position of the screen top left
+        """
+        return round((camera.x - self.origin[0]) * camera.zoom), round((camera.y - self.origin[1]) * camera.zoom)
+
+    def covers(self, camera: Camera) -> bool:
+        if self.surface is None or self.zoom != camera.zoom:
+            return False
+        x, y = self.offset(camera)
+        return 0 <= x <= 2 * WIDTH and 0 <= y <= 2 * HEIGHT
+
+    def build(self, segments: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]], camera: Camera):
+        """
+        :param segments: edge end points in world coordinates,
+            every edge is sampled along its length once per cell
+        """
+        area = self.area(camera)
+        self.origin = area.topleft
+        self.zoom = camera.zoom
+        zoom = camera.zoom
+        left, top = area.topleft
+        cell = Detail.HEATMAP_CELL
+        cols, rows = 3 * WIDTH // cell + 1, 3 * HEIGHT // cell + 1
+        hits = []
+        for (x1, y1), (x2, y2) in segments:
+            x1, y1 = (x1 - left) * zoom, (y1 - top) * zoom
+            x2, y2 = (x2 - left) * zoom, (y2 - top) * zoom
+            samples = min(int(math.hypot(x2 - x1, y2 - y1) // cell) + 1, self.MAX_SAMPLES)
+            step_x = (x2 - x1) / samples
+            step_y = (y2 - y1) / samples
+            hits.extend({(int((x1 + step_x * i) // cell), int((y1 + step_y * i) // cell))
+                         for i in range(samples + 1)})
+        counts = Counter(hits)
+
+        small = pygame.Surface((cols, rows), pygame.SRCALPHA)
+        for (x, y), count in counts.items():
+            if 0 <= x < cols and 0 <= y < rows:
+                # fixed scale, not relative to the busiest cell, so moving one edge changes only its cells
+                small.set_at((x, y), (0, 0, 0, min(int(30 + 40 * math.log1p(count)), 180)))
+        self.surface = pygame.transform.scale(small, (cols * cell, rows * cell))
+
+    def draw(self, win: pygame.Surface, rect: pygame.Rect, camera: Camera):
+        """
+        :param rect: screen rect to draw
+        """
+        win.blit(self.surface, rect, rect.move(self.offset(camera)))
@@ -1,10 +1,14 @@
 import sys
 import pygame
 
-from .algo import DfsVis, BfsVis, SCCvis, MSTvis, BridesAndArticPointsVis, DijkstraVis
+from .algo import DfsVis, BfsVis, SCCvis, MSTvis, BridesAndArticPointsVis, DijkstraVis, DistanceVis, \
+    BidirectionalVis
+from .animation import AnimationScheduler
 from .constants import *
 from .buttons_bar import ButtonsBar
 from .graph import Graph
+from .profiler import profiler
+from .render import GraphRenderer
 
 
 def main():
@@ -14,23 +18,79 @@ def main():
 
     buttons_bar = ButtonsBar()
     graph = Graph()
+    scheduler = AnimationScheduler()
+    renderer = GraphRenderer(graph, buttons_bar)
+    base_graph = None  # original graph while its condensation is shown
+    condensation = None  # SCCvis computing condensation of graph
 
     while True:
-        clock.tick(FPS)
-        win.fill(Colors.GREY)
+        dt = clock.tick(FPS)
+        profiler.next_frame()
+        profiler.count("vertices", len(graph.vertex_dict))
+        profiler.count("edges", len(graph.edge_arr))
+        with profiler.section("algorithm"):
+            scheduler.update(dt)
+        if condensation is not None and condensation.condensed is not None:
+            scheduler.cancel()
+            base_graph, graph = graph, condensation.condensed
+            condensation = None
+            renderer.graph = graph
+            buttons_bar.sync_graph_state(graph)
+            renderer.invalidate()
 
-        buttons_bar.draw(win)
-        graph.draw(win)
-
-        graph.update()
-        buttons_bar.update_algo_buttons_state(graph)
+        with profiler.section("update"):
+            graph.update()
+            buttons_bar.update_algo_buttons_state(graph)
+        with profiler.section("render"):
+            rects = renderer.render(win, [graph.draw_adding_edge, scheduler.draw, profiler.draw])
+        with profiler.section("display"):
+            pygame.display.update(rects)
 
+        profiler.begin("events")
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit(0)
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL:
+                    file_path = buttons_bar.choose_save_file_dialog()
+                    if file_path:
+                        graph.save_snapshot(file_path)
+                    renderer.invalidate()
+                elif event.key == pygame.K_l:
+                    graph.next_layout()
+                elif event.key == pygame.K_f:
+                    graph.fit_view()
+                elif event.key == pygame.K_c and base_graph is not None:
+                    # back from condensation
+                    scheduler.cancel()
+                    graph, base_graph = base_graph, None
+                    renderer.graph = graph
+                    buttons_bar.sync_graph_state(graph)
+                    renderer.invalidate()
+                elif event.key == pygame.K_c and graph.directing:
+                    # condensation of strongly connected components, shown when they are found
+                    condensation = SCCvis(graph)
+                    scheduler.start(condensation, condensation.condensation_frames())
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_visible()
+                elif event.key == pygame.K_F4:
+                    trace_path = profiler.toggle_recording()
+                    if trace_path:
+                        print(f"Trace saved to {trace_path}")
+                else:
+                    scheduler.handle_key(event.key)
+
+            # camera: right or middle button drag pans, wheel zooms to cursor
+            if event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+                Graph.camera.pan(*event.rel)
+            if event.type == pygame.MOUSEWHEEL:
+                Graph.zoom(1.1 ** event.y, pygame.mouse.get_pos())
+
+            # buttons bar covers vertices panned under it
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and \
+                    not buttons_bar.rect.collidepoint(event.pos):
                 pos = pygame.mouse.get_pos()
                 if graph.adding_edge:
                     if graph.check_clicked_vertex_while_adding_edge(pos):
@@ -42,37 +102,27 @@ def main():
             clicked_button = buttons_bar.get_clicked_button(event)
             if clicked_button:
                 if clicked_button.text == "LOAD GRAPH":
+                    scheduler.cancel()
+                    if base_graph is not None:
+                        graph, base_graph = base_graph, None
+                        renderer.graph = graph
                     file_path = buttons_bar.choose_file_dialog()
                     graph.load_graph_from_file(file_path)
+                    buttons_bar.sync_graph_state(graph)
+                    renderer.invalidate()
                 # scaling
-                if clicked_button.text == '+' and Graph.scale < 1.3:
-                    Graph.scale += 0.1
-                if clicked_button.text == '-' and Graph.scale > 0.3:
-                    Graph.scale -= 0.1
+                if clicked_button.text == '+':
+                    Graph.zoom(1.25)
+                if clicked_button.text == '-':
+                    Graph.zoom(0.8)
 
                 # change graph state
                 if clicked_button.text.endswith("DIRECTED"):
-                    if clicked_button.color == Colors.RED:
-                        graph.change_directing(True)
-                        clicked_button.change_text("DIRECTED")
-                        clicked_button.color = Colors.GREEN
-                        clicked_button.hover_color = Colors.DARK_GREEN
-                    elif clicked_button.color == Colors.GREEN:
-                        graph.change_directing(False)
-                        clicked_button.change_text("UNDIRECTED")
-                        clicked_button.color = Colors.RED
-                        clicked_button.hover_color = Colors.DARK_RED
+                    graph.change_directing(not graph.directing)
+                    buttons_bar.sync_graph_state(graph)
                 if clicked_button.text.endswith("WEIGHTED"):
-                    if clicked_button.color == Colors.RED:
-                        graph.change_weighted(True)
-                        clicked_button.change_text("WEIGHTED")
-                        clicked_button.color = Colors.GREEN
-                        clicked_button.hover_color = Colors.DARK_GREEN
-                    elif clicked_button.color == Colors.GREEN:
-                        graph.change_weighted(False)
-                        clicked_button.change_text("UNWEIGHTED")
-                        clicked_button.color = Colors.RED
-                        clicked_button.hover_color = Colors.DARK_RED
+                    graph.change_weighted(not graph.weighted)
+                    buttons_bar.sync_graph_state(graph)
 
                 if clicked_button.text == "ADD NODE":
                     pos = pygame.mouse.get_pos()
@@ -80,36 +130,61 @@ def main():
                         num = max(graph.vertex_dict.keys()) + 1
                     else:
                         num = 1
-                    graph.add_vertex(num, pos)
+                    graph.add_vertex(num, Graph.camera.to_world(pos))
                     graph.check_clicked_vertex(pos)
                 if clicked_button.text == "ADD EDGE":
                     graph.adding_edge = True
+                if clicked_button.text in PathMode.ALL:
+                    buttons_bar.next_path_mode(clicked_button)
 
                 if len(graph.vertex_dict) > 0:
                     if clicked_button.text == "DFS":
+                        scheduler.cancel()
                         start_node = buttons_bar.draw_node_choosing(win, clock, graph, "CHOOSE START NODE", Colors.PINK)
+                        renderer.invalidate()
                         dfs = DfsVis(graph)
-                        dfs.draw_dfs_vis(win, start_node)
+                        scheduler.start(dfs, dfs.dfs_frames(start_node))
                     if clicked_button.text == "BFS":
+                        scheduler.cancel()
                         start_node = buttons_bar.draw_node_choosing(win, clock, graph, "CHOOSE START NODE", Colors.PINK)
-                        bfs = BfsVis(graph)
-                        bfs.draw_bfs_vis(win, start_node)
+                        if buttons_bar.path_mode == PathMode.BIDIRECTIONAL:
+                            end_node = buttons_bar.draw_node_choosing(win, clock, graph, "CHOOSE END NODE",
+                                                                      Colors.GREEN)
+                            renderer.invalidate()
+                            bidirectional = BidirectionalVis(graph)
+                            scheduler.start(bidirectional, bidirectional.path_frames(start_node, end_node, False))
+                        else:
+                            renderer.invalidate()
+                            bfs = BfsVis(graph)
+                            scheduler.start(bfs, bfs.bfs_frames(start_node))
                     if clicked_button.text == "SCC":
                         scc = SCCvis(graph)
-                        scc.draw_scc_vis(win)
+                        scheduler.start(scc, scc.scc_frames())
                     if clicked_button.text == "MST":
                         mst = MSTvis(graph)
-                        mst.draw_mst_vis(win)
+                        scheduler.start(mst, mst.mst_frames())
                     if clicked_button.text == "BRIDGES":
                         bridges = BridesAndArticPointsVis(graph)
-                        bridges.draw_bridges_vis(win)
+                        scheduler.start(bridges, bridges.bridges_frames())
                     if clicked_button.text == "ARTIC. POINTS":
                         artic_points = BridesAndArticPointsVis(graph)
-                        artic_points.draw_artic_points_vis(win)
+                        scheduler.start(artic_points, artic_points.artic_points_frames())
                     if clicked_button.text == "DIJKSTRA":
+                        scheduler.cancel()
                         start_node = buttons_bar.draw_node_choosing(win, clock, graph, "CHOOSE START NODE", Colors.PINK)
                         end_node = buttons_bar.draw_node_choosing(win, clock, graph, "CHOOSE END NODE", Colors.GREEN)
-                        dijkstra = DijkstraVis(graph)
-                        dijkstra.draw_dijkstra_vis(win, start_node, end_node)
-
-        pygame.display.update()
+                        renderer.invalidate()
+                        if buttons_bar.path_mode == PathMode.BIDIRECTIONAL:
+                            bidirectional = BidirectionalVis(graph)
+                            scheduler.start(bidirectional, bidirectional.path_frames(start_node, end_node, True))
+                        else:
+                            dijkstra = DijkstraVis(graph)
+                            scheduler.start(dijkstra,
+                                            dijkstra.dijkstra_frames(start_node, end_node, buttons_bar.path_mode))
+                    if clicked_button.text == "DISTANCES":
+                        scheduler.cancel()
+                        start_node = buttons_bar.draw_node_choosing(win, clock, graph, "CHOOSE START NODE", Colors.PINK)
+                        renderer.invalidate()
+                        distances = DistanceVis(graph)
+                        scheduler.start(distances, distances.distance_frames(start_node))
+        profiler.end()
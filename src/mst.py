@@ -0,0 +1,197 @@
+import heapq
+from typing import Callable, Dict, List, Sequence
+
+from src.worker import CHECK_INTERVAL, checkpoint
+
+HEAP_DENSITY = 50  # edges per vertex from which Kruskal pops keys from a heap instead of sorting them
+
+
+class MSTMethod:
+    """
+    Kruskal is the method used by the app, it already adapts to density by sorting or heapifying keys,
+    Prim and Boruvka are kept for benchmarks/bench_mst.py, pure Python Kruskal beats both at every density
+    """
+
+    KRUSKAL = "kruskal"
+    PRIM = "prim"
+    BORUVKA = "boruvka"
+    ALL = (KRUSKAL, PRIM, BORUVKA)
+
+
+def edge_keys(weights: Sequence[int]) -> List[int]:
+    """
+    weight * m + edge, one int orders edges by weight and breaks ties by edge,
+    so every method finds the same forest and the edge is key % m
+    """
+    m = len(weights)
+    return [w * m + e for e, w in enumerate(weights)]
+
+
+def kruskal(n: int, src: Sequence[int], dst: Sequence[int], weights: Sequence[int], target: int) -> List[int]:
+    """
+    stops when target edges are accepted, dense graphs reach it after a small part of edges,
+    so there keys are heapified and popped instead of sorting all of them
+    """
+    tree = []
+    if target <= 0:
+        return tree
+    m = len(weights)
+    keys = edge_keys(weights)
+    checkpoint(0, target)
+    if m >= HEAP_DENSITY * n:
+        heapq.heapify(keys)
+        ordered = (heapq.heappop(keys) for _ in range(m))
+    else:
+        keys.sort()
+        ordered = keys
+    rep = list(range(n))
+    set_size = [1] * n
+    for scanned, key in enumerate(ordered):
+        if scanned % CHECK_INTERVAL == 0:
+            checkpoint(len(tree), target)
+        e = key % m
+        a = src[e]
+        while rep[a] != a:
+            rep[a] = a = rep[rep[a]]
+        b = dst[e]
+        while rep[b] != b:
+            rep[b] = b = rep[rep[b]]
+        if a == b:
+            continue
+        if set_size[a] > set_size[b]:
+            a, b = b, a
+        set_size[b] += set_size[a]
+        rep[a] = b
+        tree.append(e)
+        if len(tree) == target:
+            break
+    return tree
+
+
+def prim(n: int, src: Sequence[int], dst: Sequence[int], weights: Sequence[int], target: int) -> List[int]:
+    """
+    grows a tree from every vertex not reached yet, heap holds only keys that improved a vertex,
+    edges are scanned once from each end
+    """
+    tree = []
+    if target <= 0:
+        return tree
+    m = len(weights)
+    keys = edge_keys(weights)
+    offsets = [0] * (n + 1)
+    for e in range(m):
+        offsets[src[e] + 1] += 1
+        offsets[dst[e] + 1] += 1
+    for v in range(n):
+        offsets[v + 1] += offsets[v]
+    incident = [0] * offsets[n]
+    fill = offsets[:n]
+    for e in range(m):
+        incident[fill[src[e]]] = e
+        fill[src[e]] += 1
+        incident[fill[dst[e]]] = e
+        fill[dst[e]] += 1
+
+    no_key = max(keys, default=0) + 1
+    best = [no_key] * n
+    in_tree = [False] * n
+    for root in range(n):
+        if in_tree[root]:
+            continue
+        in_tree[root] = True
+        heap = []
+        v = root
+        while True:
+            for k in range(offsets[v], offsets[v + 1]):
+                e = incident[k]
+                u = dst[e] if src[e] == v else src[e]
+                key = keys[e]
+                if key < best[u] and not in_tree[u]:
+                    best[u] = key
+                    heapq.heappush(heap, key)
+            while heap:
+                e = heapq.heappop(heap) % m
+                if not in_tree[src[e]]:
+                    v = src[e]
+                    break
+                if not in_tree[dst[e]]:
+                    v = dst[e]
+                    break
+            else:
+                break
+            # the smallest key leaving the tree is always current, older keys of v are larger
+            in_tree[v] = True
+            tree.append(e)
+            if len(tree) == target:
+                return tree
+            if len(tree) % CHECK_INTERVAL == 0:
+                checkpoint(len(tree), target)
+    return tree
+
+
+def boruvka(n: int, src: Sequence[int], dst: Sequence[int], weights: Sequence[int], target: int) -> List[int]:
+    """
+    every round joins each component with its cheapest outgoing edge, at least halving their number,
+    edges inside one component are dropped between rounds
+    """
+    tree = []
+    if target <= 0:
+        return tree
+    m = len(weights)
+    keys = edge_keys(weights)
+    no_key = max(keys, default=0) + 1
+    comp = list(range(n))
+    live = [e for e in range(m) if src[e] != dst[e]]
+    while live:
+        checkpoint(len(tree), target)
+        cheapest = {}
+        for e in live:
+            key = keys[e]
+            a = comp[src[e]]
+            b = comp[dst[e]]
+            if key < cheapest.get(a, no_key):
+                cheapest[a] = key
+            if key < cheapest.get(b, no_key):
+                cheapest[b] = key
+        for key in cheapest.values():
+            e = key % m
+            a = comp[src[e]]
+            while comp[a] != a:
+                a = comp[a]
+            b = comp[dst[e]]
+            while comp[b] != b:
+                b = comp[b]
+            if a != b:
+                comp[a] = b
+                tree.append(e)
+        if len(tree) == target:
+            break
+        for v in range(n):
+            r = comp[v]
+            while comp[r] != r:
+                r = comp[r]
+            comp[v] = r
+        live = [e for e in live if comp[src[e]] != comp[dst[e]]]
+    return tree
+
+
+METHODS: Dict[str, Callable[[int, Sequence[int], Sequence[int], Sequence[int], int], List[int]]] = {
+    MSTMethod.KRUSKAL: kruskal,
+    MSTMethod.PRIM: prim,
+    MSTMethod.BORUVKA: boruvka,
+}
+
+
+def minimum_spanning_forest(n: int, src: Sequence[int], dst: Sequence[int], weights: Sequence[int],
+                            target: int = None, method: str = MSTMethod.KRUSKAL) -> List[int]:
+    """
+    :param src: edge start indexes, vertices are 0..n-1
+    :param weights: integer weights, ties are broken by edge index
+    :param target: number of forest edges (n minus number of components) if known, otherwise search
+        continues until edges run out
+    :param method: one of MSTMethod, other than KRUSKAL only for benchmarks
+    :return: indexes of minimum spanning forest edges
+    """
+    if target is None:
+        target = n - 1
+    return METHODS[method](n, src, dst, weights, target)
@@ -0,0 +1,171 @@
+import heapq
+import multiprocessing
+import os
+from array import array
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.constants import INFINITY
+from src.csr import CSRGraph
+from src.worker import CHECK_INTERVAL, checkpoint
+
+SHARED_ARRAYS = ("out_offsets", "out_targets", "out_edges", "in_offsets", "in_sources", "in_edges", "weights")
+MIN_PARALLEL_SOURCES = 8  # fewer sources are not worth starting processes
+
+
+class SharedCSR:
+    """
+    CSR arrays copied to shared memory blocks, pool workers attach to them by name
+    instead of receiving a pickled copy of the graph
+    """
+
+    def __init__(self, csr: CSRGraph):
+        self.n = csr.n
+        self.blocks: List[shared_memory.SharedMemory] = []
+        try:
+            for name in SHARED_ARRAYS:
+                data = getattr(csr, name)
+                block = shared_memory.SharedMemory(create=True, size=max(len(data) * data.itemsize, 1))
+                self.blocks.append(block)
+                block.buf[:len(data) * data.itemsize] = data.tobytes()
+        except OSError:
+            self.close()
+            raise
+
+    def names(self) -> List[str]:
+        return [block.name for block in self.blocks]
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self) -> 'SharedCSR':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedGraph:
+    """
+    worker side view of SharedCSR, has the same array attributes as CSRGraph
+    """
+
+    def __init__(self, names: List[str], n: int):
+        self.n = n
+        self.blocks = [shared_memory.SharedMemory(name=name) for name in names]
+        for name, block in zip(SHARED_ARRAYS, self.blocks):
+            setattr(self, name, block.buf.cast('q'))
+
+
+worker_graph: Optional[SharedGraph] = None
+
+
+def attach_worker(names: List[str], n: int):
+    global worker_graph
+    worker_graph = SharedGraph(names, n)
+
+
+def single_source(graph, source: int, directed: bool, weighted: bool) -> array:
+    """
+    :param graph: CSRGraph or SharedGraph
+    :param source: vertex index
+    :return: distances indexed by vertex index, INFINITY for unreachable vertices,
+        Dijkstra's algorithm if weighted, BFS otherwise
+    """
+    rows = [(graph.out_offsets, graph.out_targets, graph.out_edges)]
+    if not directed:
+        rows.append((graph.in_offsets, graph.in_sources, graph.in_edges))
+    dist = array('q', [INFINITY]) * graph.n
+    dist[source] = 0
+    settled = 0
+    if not weighted:
+        q = deque([source])
+        while q:
+            v = q.popleft()
+            settled += 1
+            if settled % CHECK_INTERVAL == 0:
+                checkpoint(settled, graph.n)
+            d = dist[v] + 1
+            for offsets, targets, _ in rows:
+                for k in range(offsets[v], offsets[v + 1]):
+                    u = targets[k]
+                    if dist[u] == INFINITY:
+                        dist[u] = d
+                        q.append(u)
+        return dist
+
+    weights = graph.weights
+    pq = [(0, source)]
+    while pq:
+        d, v = heapq.heappop(pq)
+        if d > dist[v]:
+            continue
+        settled += 1
+        if settled % CHECK_INTERVAL == 0:
+            checkpoint(settled, graph.n)
+        for offsets, targets, edges in rows:
+            for k in range(offsets[v], offsets[v + 1]):
+                u = targets[k]
+                du = d + weights[edges[k]]
+                if du < dist[u]:
+                    dist[u] = du
+                    heapq.heappush(pq, (du, u))
+    return dist
+
+
+def eccentricity(dist: array) -> int:
+    """
+    :return: largest finite distance, unreachable vertices are ignored
+    """
+    return max((d for d in dist if d != INFINITY), default=0)
+
+
+def worker_distances(task: Tuple[int, bool, bool, bool]) -> Tuple[int, object]:
+    source, directed, weighted, reduce = task
+    dist = single_source(worker_graph, source, directed, weighted)
+    return source, eccentricity(dist) if reduce else dist
+
+
+def run_sources(csr: CSRGraph, sources: Iterable[int], directed: bool, weighted: bool, reduce: bool,
+                processes: int = None) -> Iterator[Tuple[int, object]]:
+    """
+    :return: (vertex number, result) in order of completion
+    """
+    sources = [csr.index[s] for s in sources]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(sources) < MIN_PARALLEL_SOURCES:
+        for s in sources:
+            dist = single_source(csr, s, directed, weighted)
+            yield csr.ids[s], eccentricity(dist) if reduce else dist
+        return
+    with SharedCSR(csr) as shared:
+        with multiprocessing.Pool(processes, attach_worker, (shared.names(), csr.n)) as pool:
+            tasks = ((s, directed, weighted, reduce) for s in sources)
+            chunk = max(1, len(sources) // (processes * 8))
+            for s, result in pool.imap_unordered(worker_distances, tasks, chunk):
+                yield csr.ids[s], result
+
+
+def multi_source_distances(csr: CSRGraph, sources: Iterable[int], directed: bool, weighted: bool,
+                           processes: int = None) -> Iterator[Tuple[int, array]]:
+    """
+    shortest path distances from every source, spread over a process pool, rows come as they are finished
+    :param sources: vertex numbers, all vertices give all pairs distances
+    :return: (source number, distances indexed like csr.ids)
+    """
+    return run_sources(csr, sources, directed, weighted, False, processes)
+
+
+def eccentricities(csr: CSRGraph, directed: bool, weighted: bool, sources: Iterable[int] = None,
+                   processes: int = None) -> Dict[int, int]:
+    """
+    workers reduce their distance rows, so only one number per source crosses process boundary
+    :return: vertex number -> largest distance to a vertex reachable from it
+    """
+    if sources is None:
+        sources = csr.ids
+    return dict(run_sources(csr, sources, directed, weighted, True, processes))
@@ -0,0 +1,153 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import pygame
+
+from src.constants import Colors
+from src.fonts import text_cache
+
+MAX_TRACE_EVENTS = 500_000
+
+
+class Profiler:
+    """
+    wall clock timers around phases of the main loop, per frame totals feed the on-screen overlay,
+    while recording every section is also kept as Chrome trace event (chrome://tracing, Perfetto)
+    """
+
+    SMOOTHING = 0.1  # weight of the newest frame in displayed averages
+    HUD_REFRESH_MS = 250
+
+    def __init__(self):
+        self.visible = False
+        self.recording = False
+        self.events: deque = deque(maxlen=MAX_TRACE_EVENTS)
+        self.stack: List[Tuple[str, int]] = []
+        self.phases: Dict[str, float] = {}  # ms spent in each phase during the current frame
+        self.averages: Dict[str, float] = {}
+        self.frame_start = None
+        self.frame_ms = 0.0
+        self.counters: Dict[str, int] = {}
+        self.jobs: Dict[str, float] = {}  # ms of the last run of each background computation
+        self.hud = None
+        self.hud_time = 0
+        self.origin = time.perf_counter_ns()
+
+    def begin(self, name: str):
+        self.stack.append((name, time.perf_counter_ns()))
+
+    def end(self):
+        end = time.perf_counter_ns()
+        name, start = self.stack.pop()
+        self.phases[name] = self.phases.get(name, 0.0) + (end - start) / 1e6
+        if not self.stack:
+            self.phases["busy"] = self.phases.get("busy", 0.0) + (end - start) / 1e6
+        self.record(name, start, end)
+
+    def record(self, name: str, start: int, end: int, tid: int = 0):
+        """
+        adds complete trace event while recording, sections of worker threads come with their thread id
+        """
+        if self.recording:
+            self.events.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": tid,
+                                "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000})
+
+    def record_job(self, name: str, start: int, end: int, tid: int):
+        """
+        background computation, it runs outside of frames, so the overlay shows its last run time
+        """
+        self.jobs[name] = (end - start) / 1e6
+        self.record(name, start, end, tid)
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def count(self, name: str, value: int):
+        """
+        counter shown on the overlay and recorded as trace counter
+        """
+        self.counters[name] = value
+        if self.recording:
+            self.events.append({"name": name, "ph": "C", "pid": os.getpid(), "tid": 0,
+                                "ts": (time.perf_counter_ns() - self.origin) / 1000, "args": {name: value}})
+
+    def next_frame(self):
+        """
+        called once per main loop iteration, closes totals of the previous frame
+        """
+        now = time.perf_counter_ns()
+        if self.frame_start is not None:
+            self.frame_ms = (now - self.frame_start) / 1e6
+            self.phases["frame"] = self.frame_ms
+            for name, ms in self.phases.items():
+                average = self.averages.get(name)
+                self.averages[name] = ms if average is None else average + (ms - average) * self.SMOOTHING
+            for name in self.averages:
+                if name not in self.phases:
+                    self.averages[name] *= 1 - self.SMOOTHING
+        self.frame_start = now
+        self.phases = {}
+
+    def toggle_visible(self):
+        self.visible = not self.visible
+        self.hud = None
+
+    def toggle_recording(self) -> str:
+        """
+        starts recording, or stops it and writes trace to the current directory
+        :return: path of written trace, empty string when recording started
+        """
+        if not self.recording:
+            self.events.clear()
+            self.recording = True
+            return ""
+        self.recording = False
+        path = os.path.abspath(time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        self.export_trace(path)
+        return path
+
+    def export_trace(self, file_path: str):
+        with open(file_path, 'w') as file:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, file)
+
+    def draw(self, win: pygame.Surface) -> List[pygame.Rect]:
+        """
+        overlay in the bottom left corner, text is refreshed a few times per second to stay readable
+        :return: painted area
+        """
+        if not self.visible:
+            return []
+        now = pygame.time.get_ticks()
+        if self.hud is None or now - self.hud_time >= self.HUD_REFRESH_MS:
+            self.hud_time = now
+            self.hud = self.render_hud()
+        rect = self.hud.get_rect(bottomleft=(0, win.get_height()))
+        win.blit(self.hud, rect)
+        return [rect]
+
+    def render_hud(self) -> pygame.Surface:
+        frame = self.averages.get("frame", 0.0)
+        lines = [f"frame {frame:.1f} ms  busy {self.averages.get('busy', 0.0):.1f} ms  "
+                 f"{1000 / frame if frame else 0:.1f} FPS" + ("  REC" if self.recording else ""),
+                 "  ".join(f"{name} {value}" for name, value in self.counters.items())]
+        lines.extend(f"{name}  {ms:.2f} ms" for name, ms in self.averages.items() if name not in ("frame", "busy"))
+        lines.extend(f"{name}  {ms:.0f} ms last run" for name, ms in self.jobs.items())
+        font = text_cache.get_font(14)
+        line_h = font.get_linesize()
+        hud = pygame.Surface((max(font.size(line)[0] for line in lines) + 10, line_h * len(lines) + 10))
+        hud.fill(Colors.LIGHT_GREY)
+        for i, line in enumerate(lines):
+            hud.blit(font.render(line, True, Colors.BLACK), (5, 5 + i * line_h))
+        return hud
+
+
+profiler = Profiler()
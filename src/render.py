@@ -0,0 +1,89 @@
+from typing import Callable, List
+
+import pygame
+
+from src.buttons_bar import ButtonsBar
+from src.constants import Colors, WIDTH, HEIGHT
+from src.graph import Graph
+from src.profiler import profiler
+
+
+class GraphRenderer:
+    """
+    retained mode drawing: background, graph and buttons bar over it are kept on an off-screen layer,
+    only areas of changed vertices and edges are repainted and sent to the display,
+    overlays (scheduler status, edge being added) are drawn on top every frame
+    """
+
+    MAX_DIRTY_RECTS = 64
+
+    def __init__(self, graph: Graph, buttons_bar: ButtonsBar):
+        self.graph = graph
+        self.buttons_bar = buttons_bar
+        self.screen_rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
+        self.layer = pygame.Surface((WIDTH, HEIGHT))
+        self.scratch = pygame.Surface((WIDTH, HEIGHT))
+        self.camera_state = None
+        self.bar_state = None
+        self.overlay_rects: List[pygame.Rect] = []
+        self.full = True
+
+    def invalidate(self):
+        """
+        forces full repaint, used after something else drew on the window
+        """
+        self.full = True
+
+    def render(self, win: pygame.Surface, overlays: List[Callable[[pygame.Surface], List[pygame.Rect]]]) \
+            -> List[pygame.Rect]:
+        """
+        :param overlays: functions drawing on window and returning painted rects
+        :return: rects to pass to pygame.display.update
+        """
+        bar_state = self.buttons_bar.state()
+        if self.full or self.graph.redraw_all or self.camera_state != Graph.camera.state():
+            self.graph.take_dirty_rects()
+            self.graph.redraw_all = False
+            self.camera_state = Graph.camera.state()
+            self.bar_state = bar_state
+            self.full = False
+            self.layer.fill(Colors.GREY)
+            with profiler.section("graph.draw"):
+                self.graph.draw_region(self.layer, self.screen_rect)
+            with profiler.section("buttons.draw"):
+                self.buttons_bar.draw(self.layer)
+            win.blit(self.layer, (0, 0))
+            self.overlay_rects = [rect for overlay in overlays for rect in overlay(win)]
+            return [self.screen_rect]
+
+        dirty = [rect.clip(self.screen_rect) for rect in self.graph.take_dirty_rects()]
+        if bar_state != self.bar_state:
+            self.bar_state = bar_state
+            dirty.append(self.buttons_bar.rect)
+        dirty = [rect for rect in dirty if rect.w > 0 and rect.h > 0]
+        if dirty:
+            union = dirty[0].unionall(dirty[1:])
+            # overlapping rects would redraw the same edges many times, one pass is cheaper
+            if len(dirty) > self.MAX_DIRTY_RECTS or sum(rect.w * rect.h for rect in dirty) > union.w * union.h:
+                dirty = [union]
+        for rect in dirty:
+            self.repair(rect)
+
+        dirty.extend(self.overlay_rects)
+        for rect in dirty:
+            win.blit(self.layer, rect, rect)
+        self.overlay_rects = [rect for overlay in overlays for rect in overlay(win)]
+        return dirty + self.overlay_rects
+
+    def repair(self, rect: pygame.Rect):
+        """
+        redraws rect on scratch surface without clipping, pygame rasterizes clipped thick lines
+        differently, then copies only rect to the layer
+        """
+        self.scratch.fill(Colors.GREY, rect)
+        with profiler.section("graph.draw"):
+            self.graph.draw_region(self.scratch, rect)
+        if rect.colliderect(self.buttons_bar.rect):
+            with profiler.section("buttons.draw"):
+                self.buttons_bar.draw(self.scratch)
+        self.layer.blit(self.scratch, rect, rect)
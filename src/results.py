@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+RESULT_CACHE_ENTRIES = 32
+RESULT_CACHE_ITEMS = 4_000_000
+
+
+class ResultCache:
+    """
+    LRU cache of algorithm results keyed by (algorithm, graph version, parameters),
+    results of older graph versions are never hit again and age out,
+    bounded both by number of entries and by total number of stored steps
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_ENTRIES, max_items: int = RESULT_CACHE_ITEMS):
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self.results: OrderedDict = OrderedDict()
+        self.items = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, algorithm: str, version: int, params: tuple) -> Optional[List]:
+        """
+        :return: cached result or None, counts hits and misses
+        """
+        key: Hashable = (algorithm, version, params)
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+    def store(self, algorithm: str, version: int, params: tuple, result: List):
+        if len(result) <= self.max_items:
+            self.results[(algorithm, version, params)] = result
+            self.items += len(result)
+            while len(self.results) > self.max_entries or self.items > self.max_items:
+                self.items -= len(self.results.popitem(last=False)[1])
+
+    def clear(self):
+        self.results.clear()
+        self.items = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.results), "items": self.items}
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'GVSNAP01'
+HEADER = struct.Struct('<8sBBqq')  # magic, directed, weighted, vertices, edges
+CACHE_DIR = os.environ.get('GRAPH_VISUALIZER_CACHE') or \
+    os.path.join(os.path.expanduser('~'), '.cache', 'graph-visualizer')
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class Snapshot:
+    """
+    vertices with positions, edges with weights and graph flags,
+    stored as header followed by little-endian int64 arrays: ids, x, y, src, dst, weights
+    """
+
+    def __init__(self, directed: bool = False, weighted: bool = False):
+        self.directed = directed
+        self.weighted = weighted
+        self.ids = array('q')
+        self.xs = array('q')
+        self.ys = array('q')
+        self.src = array('q')
+        self.dst = array('q')
+        self.weights = array('q')
+
+    def arrays(self):
+        return self.ids, self.xs, self.ys, self.src, self.dst, self.weights
+
+
+def is_snapshot(file_path: str) -> bool:
+    try:
+        with open(file_path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except (OSError, TypeError):
+        return False
+
+
+def write_snapshot(file_path: str, snapshot: Snapshot):
+    """
+    writes to temporary file first so a crash never leaves half written snapshot
+    """
+    tmp_path = f"{file_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, snapshot.directed, snapshot.weighted, len(snapshot.ids), len(snapshot.src)))
+        for arr in snapshot.arrays():
+            if sys.byteorder == 'big':
+                arr = array('q', arr)
+                arr.byteswap()
+            arr.tofile(file)
+    os.replace(tmp_path, file_path)
+
+
+def read_snapshot(file_path: str) -> Snapshot:
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise SnapshotError(f"{file_path}: truncated header")
+    magic, directed, weighted, n, m = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError(f"{file_path}: not a graph snapshot")
+    if len(data) != HEADER.size + 8 * (3 * n + 3 * m):
+        raise SnapshotError(f"{file_path}: size does not match {n} vertices and {m} edges")
+
+    snapshot = Snapshot(bool(directed), bool(weighted))
+    offset = HEADER.size
+    for arr, count in zip(snapshot.arrays(), (n, n, n, m, m, m)):
+        arr.frombytes(data[offset:offset + 8 * count])
+        if sys.byteorder == 'big':
+            arr.byteswap()
+        offset += 8 * count
+    return snapshot
+
+
+def cache_path_for(file_path: str) -> str:
+    """
+    :return: snapshot cache location for text graph file, named by hash of its path and hash of its mtime and size
+    """
+    stat = os.stat(file_path)
+    path_key = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+    version_key = hashlib.sha1(f"{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{path_key}-{version_key}.gvs")
+
+
+def remove_stale_cache(cache_path: str):
+    """
+    deletes cached snapshots of older versions of the same text file
+    """
+    directory, name = os.path.split(cache_path)
+    prefix = name.split('-')[0] + '-'
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for other in names:
+        if other.startswith(prefix) and other.endswith('.gvs') and other != name:
+            try:
+                os.remove(os.path.join(directory, other))
+            except OSError:
+                pass
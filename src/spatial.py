@@ -0,0 +1,94 @@
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pygame
+
+
+class SpatialGrid:
+    """
+    uniform grid over rectangles, every item is stored in all cells its rect overlaps,
+    items overlapping more than MAX_ITEM_CELLS cells are kept aside and tested one by one
+    """
+
+    MAX_ITEM_CELLS = 64
+
+    def __init__(self, cell_size: int):
+        self.cell_size = max(int(cell_size), 1)
+        self.cells: defaultdict[Tuple[int, int], Dict[Hashable, None]] = defaultdict(dict)
+        self.item_cells: Dict[Hashable, Optional[List[Tuple[int, int]]]] = {}
+        self.large: Dict[Hashable, pygame.Rect] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_cells)
+
+    def cell_range(self, rect: pygame.Rect) -> Tuple[int, int, int, int]:
+        return (rect.left // self.cell_size, rect.top // self.cell_size,
+                (rect.right - 1) // self.cell_size, (rect.bottom - 1) // self.cell_size)
+
+    def cells_for_rect(self, rect: pygame.Rect) -> Optional[List[Tuple[int, int]]]:
+        """
+        :return: cells overlapped by rect, None if there are more than MAX_ITEM_CELLS of them
+        """
+        x0, y0, x1, y1 = self.cell_range(rect)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self.MAX_ITEM_CELLS:
+            return None
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def insert(self, key: Hashable, rect: pygame.Rect):
+        cells = self.cells_for_rect(rect)
+        if cells is None:
+            self.large[key] = pygame.Rect(rect)
+        else:
+            for cell in cells:
+                self.cells[cell][key] = None
+        self.item_cells[key] = cells
+
+    def remove(self, key: Hashable):
+        self.large.pop(key, None)
+        for cell in self.item_cells.pop(key, None) or []:
+            bucket = self.cells[cell]
+            bucket.pop(key, None)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, key: Hashable, rect: pygame.Rect):
+        """
+        reindexes item only if it crossed a cell border
+        """
+        cells = self.cells_for_rect(rect)
+        if cells is not None and self.item_cells.get(key) == cells:
+            return
+        self.remove(key)
+        self.insert(key, rect)
+
+    def query_point(self, pos: Tuple[int, int]) -> List[Hashable]:
+        """
+        :return: keys of items whose cells contain the point, caller does the exact test
+        """
+        found = list(self.cells.get((int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size), ()))
+        if self.large:
+            found.extend(key for key, rect in self.large.items() if rect.collidepoint(pos))
+        return found
+
+    def query_rect(self, rect: pygame.Rect) -> List[Hashable]:
+        found = {}
+        x0, y0, x1, y1 = self.cell_range(rect)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # rect spans more cells than are occupied, e.g. zoomed out view
+            for (x, y), bucket in self.cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.update(bucket)
+        else:
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    bucket = self.cells.get((x, y))
+                    if bucket:
+                        found.update(bucket)
+        if self.large:
+            found.update((key, None) for key, r in self.large.items() if r.colliderect(rect))
+        return list(found)
+
+    def clear(self):
+        self.cells.clear()
+        self.item_cells.clear()
+        self.large.clear()
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+CHECK_INTERVAL = 4096  # vertices or edges long loops of compute handle between calls of checkpoint
+
+running = threading.local()  # job of the current thread, unset outside of jobs
+
+
+class Cancelled(Exception):
+    """
+    raised by checkpoint inside compute of a cancelled job
+    """
+
+
+def checkpoint(done: int, total: int):
+    """
+    called by long loops that yield nothing until they end, reports progress of the job running on this thread
+    and stops it if it was cancelled, does nothing on other threads
+    :param done: vertices or edges handled so far out of total
+    """
+    job = getattr(running, "job", None)
+    if job is not None:
+        job.progress = done / total if total else 0.0
+        if job.cancelled.is_set():
+            raise Cancelled
+
+
+class BackgroundJob:
+    """
+    runs compute on a daemon thread, compute must only read data the main loop does not change
+    (CSR snapshot of the graph), steps are counted for progress and cancel is checked between them
+    and at every checkpoint of compute, a cancelled job is abandoned and its thread ends at the next one
+    """
+
+    def __init__(self, name: str, compute: Callable[[], Iterable]):
+        self.name = name
+        self.compute = compute
+        self.steps = 0
+        self.progress = 0.0  # fraction reported by checkpoint
+        self.result: Optional[List] = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = self.start_ns
+        self.thread = threading.Thread(target=self.run, name=f"compute-{name}", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        running.job = self
+        try:
+            result = []
+            for step in self.compute():
+                if self.cancelled.is_set():
+                    return
+                result.append(step)
+                self.steps += 1
+            self.result = result
+        except Cancelled:
+            pass
+        except Exception as error:
+            self.error = error
+        finally:
+            self.end_ns = time.perf_counter_ns()
+            self.finished.set()
+
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def wait(self) -> List:
+        """
+        blocks until compute ends, errors of compute are raised here
+        :return: list of steps
+        """
+        self.finished.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def elapsed(self) -> float:
+        """
+        :return: seconds since start, or run time once finished
+        """
+        end = self.end_ns if self.done() else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e9
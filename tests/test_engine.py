@@ -0,0 +1,118 @@
+from collections import Counter
+
+import pytest
+
+from src.csr import CSRGraph
+from src.engine import (DfsEvent, dfs_events, scc_steps, mst_steps, biconnectivity_steps, ArticulationPointFound,
+                        BlockFound, BridgeFound, TwoEdgeComponentFound)
+from src.forest import UnionFind
+from src.worker import BackgroundJob
+
+N = 10 ** 6  # deeper than any recursion limit, a recursive dfs would raise RecursionError
+SIDE = 1000  # grid of SIDE * SIDE = N vertices
+
+
+@pytest.fixture(scope="module")
+def chain() -> CSRGraph:
+    """
+    1 -> 2 -> ... -> N
+    """
+    return CSRGraph(range(1, N + 1), ((v, v + 1, 1) for v in range(1, N)))
+
+
+@pytest.fixture(scope="module")
+def grid() -> CSRGraph:
+    """
+    SIDE x SIDE grid, edges go right and down, vertex of row r and column c is r * SIDE + c + 1
+    """
+    def edges():
+        for r in range(SIDE):
+            for c in range(SIDE):
+                v = r * SIDE + c + 1
+                if c + 1 < SIDE:
+                    yield v, v + 1, 1
+                if r + 1 < SIDE:
+                    yield v, v + SIDE, 1
+
+    return CSRGraph(range(1, N + 1), edges())
+
+
+def test_dfs_events_chain(chain: CSRGraph):
+    events = Counter()
+    last = None
+    for event, v, u, e in dfs_events(chain.view(True), [0]):
+        events[event] += 1
+        last = (event, v)
+    assert events[DfsEvent.PRE] == N
+    assert events[DfsEvent.POST] == N
+    assert events[DfsEvent.TREE] == N - 1
+    assert last == (DfsEvent.POST, 0)
+
+
+def test_dfs_events_grid(grid: CSRGraph):
+    events = Counter(event for event, _, _, _ in dfs_events(grid.view(False), [0]))
+    assert events[DfsEvent.PRE] == N
+    assert events[DfsEvent.TREE] == N - 1
+    # every non-tree edge of an undirected graph is seen once, as back edge
+    assert events[DfsEvent.BACK] == grid.m - (N - 1)
+
+
+def test_scc_chain(chain: CSRGraph):
+    steps = list(scc_steps(chain))
+    assert len(steps) == N
+    # topological order
+    assert [step.vertices for step in steps[:3]] == [[1], [2], [3]]
+
+
+def test_scc_grid_both_directions(grid: CSRGraph):
+    both = CSRGraph(grid.ids, ((grid.ids[a], grid.ids[b], 1) for e in range(grid.m)
+                               for a, b in ((grid.src[e], grid.dst[e]), (grid.dst[e], grid.src[e]))))
+    steps = list(scc_steps(both))
+    assert len(steps) == 1
+    assert len(steps[0].vertices) == N
+
+
+def test_cancelled_scc_stops_before_first_step(chain: CSRGraph):
+    job = BackgroundJob("scc", lambda: scc_steps(chain))
+    job.cancel()
+    assert job.wait() is None
+    # components are yielded only after the whole pass, so the job stopped at a checkpoint inside it
+    assert job.steps == 0
+
+
+def test_mst_chain(chain: CSRGraph):
+    steps = list(mst_steps(chain))
+    assert len(steps) == N - 1
+    assert sum(step.weight for step in steps) == N - 1
+
+
+def test_biconnectivity_chain(chain: CSRGraph):
+    kinds = Counter(type(step) for step in biconnectivity_steps(chain))
+    assert kinds[BridgeFound] == N - 1
+    assert kinds[ArticulationPointFound] == N - 2
+    assert kinds[BlockFound] == N - 1
+    assert kinds[TwoEdgeComponentFound] == N
+
+
+def test_biconnectivity_grid(grid: CSRGraph):
+    steps = list(biconnectivity_steps(grid))
+    assert not any(isinstance(step, (BridgeFound, ArticulationPointFound)) for step in steps)
+    blocks = [step for step in steps if isinstance(step, BlockFound)]
+    assert len(blocks) == 1
+    assert len(blocks[0].edges) == grid.m
+    components = [step for step in steps if isinstance(step, TwoEdgeComponentFound)]
+    assert len(components) == 1
+    assert len(components[0].vertices) == N
+
+
+def test_union_find_deep_chain():
+    dsu = UnionFind()
+    for v in range(N):
+        dsu.add(v)
+    # parent pointers as no union by size would leave them, find must not recurse
+    for v in range(N - 1):
+        dsu.rep[v] = v + 1
+    dsu.count = 1
+    assert dsu.find(0) == N - 1
+    assert all(dsu.rep[v] == N - 1 for v in range(0, N, 997))
+    assert not dsu.join(0, N // 2)
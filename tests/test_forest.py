@@ -0,0 +1,106 @@
+import random
+from typing import List, Tuple
+
+import pytest
+
+import src.forest
+from src.forest import SpanningForest
+from src.worker import BackgroundJob, running
+
+VERTICES = 300
+ROUNDS = 60
+
+Edge = Tuple[int, int, int]  # (a, b, weight), edge id is the index in the list
+
+
+def reference_kruskal(n: int, edges: List[Edge]) -> List[int]:
+    """
+    minimum spanning forest by sorting all edges, ties are broken by edge id as in SpanningForest
+    """
+    rep = list(range(n + 1))
+
+    def find(v: int) -> int:
+        while rep[v] != v:
+            rep[v] = v = rep[rep[v]]
+        return v
+
+    forest = []
+    for e in sorted(range(len(edges)), key=lambda e: (edges[e][2], e)):
+        a, b = find(edges[e][0]), find(edges[e][1])
+        if a != b:
+            rep[a] = b
+            forest.append(e)
+    return sorted(forest)
+
+
+def add_random_edges(forest: SpanningForest, edges: List[Edge], rng: random.Random, count: int):
+    for _ in range(count):
+        # few distinct weights, so ties are common, loops are added too and never join the forest
+        edge = rng.randint(1, VERTICES), rng.randint(1, VERTICES), rng.randint(1, 10)
+        forest.add_edge(len(edges), *edge)
+        edges.append(edge)
+
+
+def new_forest(forest: SpanningForest = None) -> SpanningForest:
+    forest = forest or SpanningForest()
+    for v in range(1, VERTICES + 1):
+        forest.add_vertex(v)
+    return forest
+
+
+class CancelledAfter(SpanningForest):
+    """
+    cancels the job it runs in after inserting given number of edges one by one
+    """
+
+    def __init__(self, inserts: int):
+        super().__init__()
+        self.inserts = inserts
+
+    def insert(self, key, a, b):
+        super().insert(key, a, b)
+        self.inserts -= 1
+        if self.inserts == 0:
+            running.job.cancel()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interleaved_single_and_batch_inserts(seed: int):
+    rng = random.Random(seed)
+    forest = new_forest()
+    edges: List[Edge] = []
+    for _ in range(ROUNDS):
+        # small batches are inserted one by one into the link-cut trees, big ones rebuild the forest
+        add_random_edges(forest, edges, rng, rng.choice((1, 2, 5, 50, 300)))
+        assert sorted(forest.edges()) == reference_kruskal(VERTICES, edges)
+
+
+def test_cancelled_rebuild_then_rerun():
+    rng = random.Random(0)
+    forest = new_forest()
+    edges: List[Edge] = []
+    add_random_edges(forest, edges, rng, 1000)
+    with forest.lock:
+        # job waits for the lock, so it is cancelled before it merges anything
+        job = BackgroundJob("mst", forest.edges)
+        job.cancel()
+    assert job.wait() is None
+    assert forest.tree == {}
+    assert sorted(forest.edges()) == reference_kruskal(VERTICES, edges)
+
+
+def test_cancelled_single_inserts_then_rerun(monkeypatch):
+    monkeypatch.setattr(src.forest, "CHECK_INTERVAL", 1)
+    rng = random.Random(1)
+    forest = new_forest(CancelledAfter(2))
+    edges: List[Edge] = []
+    add_random_edges(forest, edges, rng, 1000)
+    assert sorted(forest.edges()) == reference_kruskal(VERTICES, edges)
+    add_random_edges(forest, edges, rng, 5)
+    pending = len(forest.pending)
+    job = BackgroundJob("mst", forest.edges)
+    assert job.wait() is None
+    # two edges were merged before the cancel, the others wait for the next call
+    assert len(forest.pending) == pending - 2
+    add_random_edges(forest, edges, rng, 2)
+    assert sorted(forest.edges()) == reference_kruskal(VERTICES, edges)